@@ -1,9 +1,10 @@
 """Analysis layer for RepoAnalyzer."""
 
 from analysis.language_detector import detect_language, get_repo_language_stats
-from analysis.stack_detector import detect_frameworks, detect_databases, detect_infrastructure
+from analysis.stack_detector import detect_frameworks, detect_databases, detect_infrastructure, detect_stack
 from analysis.structure_analyzer import classify_folders
 from analysis.entrypoint_finder import find_entrypoints
+from analysis.file_index import PreparedFile, prepare_files
 
 __all__ = [
     "detect_language",
@@ -11,6 +12,9 @@ __all__ = [
     "detect_frameworks",
     "detect_databases",
     "detect_infrastructure",
+    "detect_stack",
     "classify_folders",
     "find_entrypoints",
+    "PreparedFile",
+    "prepare_files",
 ]
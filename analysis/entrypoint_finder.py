@@ -5,6 +5,8 @@ Identifies application entry points in various languages and frameworks.
 from typing import Dict, List
 import re
 
+from analysis.file_index import prepare_files
+
 
 # Entry point file patterns
 ENTRYPOINT_FILES = {
@@ -53,36 +55,28 @@ DOCKER_PATTERNS = {
     "ENTRYPOINT": r"ENTRYPOINT\s+\[",
 }
 
+# Patterns compiled once at import time; each framework's patterns are
+# fused into a single alternation so file content is scanned only once
+_COMPILED_FRAMEWORK_PATTERNS = {
+    framework: re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+    for framework, patterns in FRAMEWORK_ENTRYPOINT_PATTERNS.items()
+}
+
+# Dockerfile lines starting with CMD or ENTRYPOINT, ignoring leading whitespace
+_DOCKER_LINE_RE = re.compile(r"^[^\S\n]*(?:CMD|ENTRYPOINT).*", re.MULTILINE)
+
 
 def _check_framework_patterns(content: str, framework: str) -> bool:
     """Check if content matches framework-specific patterns."""
-    if framework not in FRAMEWORK_ENTRYPOINT_PATTERNS:
+    if framework not in _COMPILED_FRAMEWORK_PATTERNS:
         return False
     
-    patterns = FRAMEWORK_ENTRYPOINT_PATTERNS[framework]
-    for pattern in patterns:
-        if re.search(pattern, content, re.IGNORECASE):
-            return True
-    
-    return False
+    return _COMPILED_FRAMEWORK_PATTERNS[framework].search(content) is not None
 
 
 def _extract_docker_entrypoints(content: str) -> List[str]:
     """Extract CMD and ENTRYPOINT from Dockerfile."""
-    entrypoints = []
-    
-    for line in content.split("\n"):
-        line = line.strip()
-        
-        # Check for CMD
-        if line.startswith("CMD"):
-            entrypoints.append(line)
-        
-        # Check for ENTRYPOINT
-        if line.startswith("ENTRYPOINT"):
-            entrypoints.append(line)
-    
-    return entrypoints
+    return [match.group(0).strip() for match in _DOCKER_LINE_RE.finditer(content)]
 
 
 def find_entrypoints(files: List[Dict[str, str]]) -> Dict[str, List[Dict[str, str]]]:
@@ -90,7 +84,8 @@ def find_entrypoints(files: List[Dict[str, str]]) -> Dict[str, List[Dict[str, st
     Find application entry points in the repository.
     
     Args:
-        files: List of file objects with 'path', 'extension', 'content' keys
+        files: List of file objects with 'path', 'extension', 'content' keys,
+            or PreparedFile records from prepare_files
         
     Returns:
         Dictionary categorizing found entry points by type
@@ -101,27 +96,37 @@ def find_entrypoints(files: List[Dict[str, str]]) -> Dict[str, List[Dict[str, st
         "docker_entrypoints": [],
     }
     
-    for file_obj in files:
-        path = file_obj.get("path", "")
-        content = file_obj.get("content", "")
-        filename = path.split("/")[-1] if "/" in path else path
+    # Paths already recorded, so each path is listed at most once per bucket
+    seen_app_paths = set()
+    seen_framework_paths = set()
+    
+    for prepared in prepare_files(files):
+        path = prepared.path
+        content = prepared.content
+        filename = prepared.filename
         
         # Check for standard entrypoint files
-        for language, entrypoint_files in ENTRYPOINT_FILES.items():
-            if filename in entrypoint_files:
-                result["application_files"].append({
-                    "path": path,
-                    "type": language,
-                    "filename": filename,
-                })
+        if path not in seen_app_paths:
+            for language, entrypoint_files in ENTRYPOINT_FILES.items():
+                if filename in entrypoint_files:
+                    seen_app_paths.add(path)
+                    result["application_files"].append({
+                        "path": path,
+                        "type": language,
+                        "filename": filename,
+                    })
+                    break
         
         # Check for framework-specific patterns
-        for framework in FRAMEWORK_ENTRYPOINT_PATTERNS.keys():
-            if _check_framework_patterns(content, framework):
-                result["framework_entrypoints"].append({
-                    "path": path,
-                    "framework": framework,
-                })
+        if path not in seen_framework_paths:
+            for framework in FRAMEWORK_ENTRYPOINT_PATTERNS.keys():
+                if _check_framework_patterns(content, framework):
+                    seen_framework_paths.add(path)
+                    result["framework_entrypoints"].append({
+                        "path": path,
+                        "framework": framework,
+                    })
+                    break
         
         # Check for Docker entrypoints
         if filename == "Dockerfile" or "Dockerfile" in path:
@@ -133,8 +138,4 @@ def find_entrypoints(files: List[Dict[str, str]]) -> Dict[str, List[Dict[str, st
                         "command": entry,
                     })
     
-    # Remove duplicates while preserving order
-    result["application_files"] = list({f["path"]: f for f in result["application_files"]}.values())
-    result["framework_entrypoints"] = list({f["path"]: f for f in result["framework_entrypoints"]}.values())
-    
     return result
\ No newline at end of file
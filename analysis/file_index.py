@@ -0,0 +1,57 @@
+"""
+Prepared file records for RepoAnalyzer.
+Derives per-file fields once so every analyzer can reuse them.
+"""
+from typing import Dict, List, NamedTuple, Sequence, Union
+
+
+class PreparedFile(NamedTuple):
+    """A repository file with commonly used path fields precomputed."""
+    
+    path: str
+    content: str
+    filename: str
+    extension: str
+    folder: str
+
+
+def prepare_file(file_obj: Dict[str, str]) -> PreparedFile:
+    """
+    Build a prepared record for a single file object.
+    
+    Args:
+        file_obj: File object with 'path' and 'content' keys
+        
+    Returns:
+        PreparedFile with filename, extension and top-level folder derived from the path
+    """
+    path = file_obj.get("path", "")
+    _, dot, suffix = path.rpartition(".")
+    head, slash, _ = path.partition("/")
+    
+    return PreparedFile(
+        path=path,
+        content=file_obj.get("content", ""),
+        filename=path.rpartition("/")[2],
+        extension="." + suffix if dot else "",
+        folder=head if slash else "",
+    )
+
+
+def prepare_files(files: Sequence[Union[Dict[str, str], PreparedFile]]) -> List[PreparedFile]:
+    """
+    Prepare a list of file objects for analysis.
+    
+    Already prepared lists are returned unchanged, so callers can prepare
+    once and pass the result to every analyzer.
+    
+    Args:
+        files: List of file objects with 'path' and 'content' keys, or PreparedFile records
+        
+    Returns:
+        List of PreparedFile records
+    """
+    if files and isinstance(files[0], PreparedFile):
+        return files
+    
+    return [prepare_file(file_obj) for file_obj in files]
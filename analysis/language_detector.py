@@ -4,6 +4,10 @@ Maps file extensions to programming languages and provides statistics.
 """
 from typing import Dict, List
 from collections import defaultdict
+from functools import lru_cache
+import re
+
+from analysis.file_index import prepare_files
 
 
 # Extension to language mapping
@@ -91,6 +95,12 @@ EXTENSION_TO_LANGUAGE = {
     ".markdown": "Markdown",
 }
 
+# Lowercase extensions without the leading dot, for suffix lookups
+_EXT_MAP = {ext[1:].lower(): language for ext, language in EXTENSION_TO_LANGUAGE.items()}
+
+# Matches lines that are empty or whitespace-only
+_BLANK_LINE_RE = re.compile(r"^[^\S\n]*$", re.MULTILINE)
+
 
 def detect_language(file_path: str) -> str:
     """
@@ -103,13 +113,22 @@ def detect_language(file_path: str) -> str:
         Language name or "Unknown"
     """
     # Extract extension
-    if "." not in file_path:
+    _, dot, extension = file_path.rpartition(".")
+    if not dot:
         return "Unknown"
     
-    extension = "." + file_path.rsplit(".", 1)[-1]
-    extension_lower = extension.lower()
-    
-    return EXTENSION_TO_LANGUAGE.get(extension_lower, "Unknown")
+    return _ext_to_lang(extension)
+
+
+@lru_cache(maxsize=128)
+def _ext_to_lang(extension: str) -> str:
+    """Map a dotless extension, in any case, to a language name."""
+    return _EXT_MAP.get(extension.lower(), "Unknown")
+
+
+def _language_for_extension(extension: str) -> str:
+    """Map a precomputed '.ext' extension (or "") to a language name."""
+    return _ext_to_lang(extension[1:])
 
 
 def get_repo_language_stats(files: List[Dict[str, str]]) -> Dict[str, any]:
@@ -117,7 +136,8 @@ def get_repo_language_stats(files: List[Dict[str, str]]) -> Dict[str, any]:
     Calculate language statistics for a repository.
     
     Args:
-        files: List of file objects with 'path', 'extension', 'content' keys
+        files: List of file objects with 'path', 'extension', 'content' keys,
+            or PreparedFile records from prepare_files
         
     Returns:
         Dictionary with language counts, percentages, and primary language
@@ -126,16 +146,14 @@ def get_repo_language_stats(files: List[Dict[str, str]]) -> Dict[str, any]:
     language_lines = defaultdict(int)
     total_files = 0
     
-    for file_obj in files:
-        path = file_obj.get("path", "")
-        content = file_obj.get("content", "")
-        
-        language = detect_language(path)
+    for prepared in prepare_files(files):
+        content = prepared.content
+        language = _language_for_extension(prepared.extension)
         
         if language != "Unknown":
             language_counts[language] += 1
-            # Count non-empty lines
-            lines = len([line for line in content.split("\n") if line.strip()])
+            # Count non-empty lines without materializing each line
+            lines = content.count("\n") + 1 - len(_BLANK_LINE_RE.findall(content))
             language_lines[language] += lines
             total_files += 1
     
@@ -2,9 +2,18 @@
 Stack detection for RepoAnalyzer.
 Detects frameworks, databases, and infrastructure tools from code and config files.
 """
-from typing import Dict, List, Set
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set
+import json
 import re
 
+from analysis.file_index import PreparedFile, prepare_files
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 
 # Framework detection patterns
 FRAMEWORK_PATTERNS = {
@@ -143,112 +152,291 @@ INFRA_PATTERNS = {
 }
 
 
-def _check_imports(content: str, patterns: List[str]) -> bool:
-    """Check if content contains any import pattern."""
+def _build_keyword_automaton(keywords: List[str]):
+    """Build an Aho-Corasick automaton over keywords, if pyahocorasick is available."""
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def _lower_keywords(table: Dict[str, Dict[str, List[str]]]) -> Dict[str, Dict[str, FrozenSet[str]]]:
+    """Lowercase the import and dependency patterns of each table entry once."""
+    return {
+        name: {
+            key: frozenset(pattern.lower() for pattern in patterns[key])
+            for key in ("imports", "dependencies")
+            if key in patterns
+        }
+        for name, patterns in table.items()
+    }
+
+
+# Lowercased keywords matched case-insensitively against file content
+_FRAMEWORK_KEYWORDS = _lower_keywords(FRAMEWORK_PATTERNS)
+_DATABASE_KEYWORDS = _lower_keywords(DATABASE_PATTERNS)
+
+_CONTENT_KEYWORDS = sorted({
+    keyword
+    for table in (_FRAMEWORK_KEYWORDS, _DATABASE_KEYWORDS)
+    for keywords in table.values()
+    for keyword_set in keywords.values()
+    for keyword in keyword_set
+})
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton(_CONTENT_KEYWORDS)
+
+
+def _find_keywords(content: str) -> FrozenSet[str]:
+    """Find every known keyword in content with a single scan."""
     content_lower = content.lower()
-    for pattern in patterns:
-        if pattern.lower() in content_lower:
-            return True
-    return False
+    
+    if _KEYWORD_AUTOMATON is not None:
+        return frozenset(keyword for _, keyword in _KEYWORD_AUTOMATON.iter(content_lower))
+    
+    return frozenset(keyword for keyword in _CONTENT_KEYWORDS if keyword in content_lower)
+
+
+def _file_keywords(
+    prepared: PreparedFile,
+    keyword_index: Optional[Dict[str, FrozenSet[str]]]
+) -> FrozenSet[str]:
+    """Get a file's keywords, filling keyword_index so another detector can reuse them."""
+    if keyword_index is None:
+        return _find_keywords(prepared.content)
+    
+    found_keywords = keyword_index.get(prepared.path)
+    if found_keywords is None:
+        found_keywords = keyword_index[prepared.path] = _find_keywords(prepared.content)
+    return found_keywords
 
 
-def _check_dependencies(file_path: str, content: str, patterns: List[str]) -> bool:
+@lru_cache(maxsize=256)
+def _parse_npm_dependencies(content: str) -> Optional[FrozenSet[str]]:
+    """
+    Parse the dependency names declared in a package.json file.
+    
+    Returns None if the content is not a valid package.json object.
+    """
+    try:
+        manifest = json.loads(content)
+    except ValueError:
+        return None
+    
+    if not isinstance(manifest, dict):
+        return None
+    
+    dependencies = set()
+    for section in ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies"):
+        declared = manifest.get(section)
+        if isinstance(declared, dict):
+            dependencies.update(declared)
+    
+    return frozenset(dependencies)
+
+
+def _check_imports(found_keywords: FrozenSet[str], keywords: FrozenSet[str]) -> bool:
+    """Check if any lowercased import pattern was found in the content."""
+    return not found_keywords.isdisjoint(keywords)
+
+
+def _dependency_file_kind(file_path: str) -> Optional[str]:
+    """Classify a path as a Python or npm dependency manifest, if it is one."""
+    if "requirements.txt" in file_path or "pyproject.toml" in file_path:
+        return "python"
+    if "package.json" in file_path:
+        return "npm"
+    return None
+
+
+def _check_dependencies(
+    dep_kind: Optional[str],
+    content: str,
+    found_keywords: FrozenSet[str],
+    patterns: List[str],
+    keywords: FrozenSet[str]
+) -> bool:
     """Check if dependency file contains any pattern."""
-    if "requirements.txt" in file_path:
+    if dep_kind == "python":
+        return _check_imports(found_keywords, keywords)
+    
+    if dep_kind == "npm":
+        npm_dependencies = _parse_npm_dependencies(content)
+        if npm_dependencies is not None:
+            return not npm_dependencies.isdisjoint(patterns)
+        
+        # Fall back to a raw text search if the manifest can't be parsed
         for pattern in patterns:
-            if pattern.lower() in content.lower():
+            if f'"{pattern}"' in content or f"'{pattern}'" in content:
                 return True
     
-    if "pyproject.toml" in file_path:
-        for pattern in patterns:
-            if pattern.lower() in content.lower():
+    return False
+
+
+def _matches_framework(
+    framework: str,
+    path: str,
+    content: str,
+    found_keywords: FrozenSet[str],
+    dep_kind: Optional[str]
+) -> bool:
+    """Check whether a single file indicates the given framework."""
+    patterns = FRAMEWORK_PATTERNS[framework]
+    keywords = _FRAMEWORK_KEYWORDS[framework]
+    
+    # Check imports
+    if "imports" in keywords and _check_imports(found_keywords, keywords["imports"]):
+        return True
+    
+    # Check dependency files
+    if "dependencies" in patterns and _check_dependencies(
+        dep_kind, content, found_keywords, patterns["dependencies"], keywords["dependencies"]
+    ):
+        return True
+    
+    # Check specific files
+    if "files" in patterns:
+        for file_pattern in patterns["files"]:
+            if file_pattern in path:
                 return True
     
-    if "package.json" in file_path:
-        for pattern in patterns:
-            if f'"{pattern}"' in content or f"'{pattern}'" in content:
+    return False
+
+
+def _matches_database(
+    database: str,
+    path: str,
+    content: str,
+    found_keywords: FrozenSet[str],
+    dep_kind: Optional[str]
+) -> bool:
+    """Check whether a single file indicates the given database."""
+    patterns = DATABASE_PATTERNS[database]
+    keywords = _DATABASE_KEYWORDS[database]
+    
+    # Check imports
+    if "imports" in keywords and _check_imports(found_keywords, keywords["imports"]):
+        return True
+    
+    # Check dependencies
+    if "dependencies" in patterns and _check_dependencies(
+        dep_kind, content, found_keywords, patterns["dependencies"], keywords["dependencies"]
+    ):
+        return True
+    
+    # Check config strings
+    if "config" in patterns:
+        for config_pattern in patterns["config"]:
+            if config_pattern in content:
+                return True
+    
+    # Check file extensions
+    if "files" in patterns:
+        for file_pattern in patterns["files"]:
+            if path.endswith(file_pattern):
+                return True
+    
+    return False
+
+
+def _matches_infrastructure(tool: str, path: str, content: str) -> bool:
+    """Check whether a single file indicates the given infrastructure tool."""
+    patterns = INFRA_PATTERNS[tool]
+    
+    # Check specific files
+    if "files" in patterns:
+        for file_pattern in patterns["files"]:
+            if file_pattern in path:
+                return True
+    
+    # Check extensions
+    if "extensions" in patterns:
+        for ext in patterns["extensions"]:
+            if path.endswith(ext):
+                # If content patterns exist, check them too
+                if "content" in patterns:
+                    return any(content_pattern in content for content_pattern in patterns["content"])
                 return True
     
     return False
 
 
-def detect_frameworks(files: List[Dict[str, str]]) -> List[str]:
+def detect_frameworks(
+    files: List[Dict[str, str]],
+    keyword_index: Optional[Dict[str, FrozenSet[str]]] = None
+) -> List[str]:
     """
     Detect frameworks used in the repository.
     
     Args:
-        files: List of file objects with 'path', 'extension', 'content' keys
+        files: List of file objects with 'path', 'extension', 'content' keys,
+            or PreparedFile records from prepare_files
+        keyword_index: Optional mapping of path to content keywords, filled as
+            files are scanned; pass the same dict to both detectors to scan
+            each file once
         
     Returns:
         List of detected framework names
     """
     detected = set()
+    pending = set(FRAMEWORK_PATTERNS)
     
-    for framework, patterns in FRAMEWORK_PATTERNS.items():
-        for file_obj in files:
-            path = file_obj.get("path", "")
-            content = file_obj.get("content", "")
-            
-            # Check imports
-            if "imports" in patterns and _check_imports(content, patterns["imports"]):
-                detected.add(framework)
-                break
-            
-            # Check dependency files
-            if "dependencies" in patterns and _check_dependencies(path, content, patterns["dependencies"]):
+    for prepared in prepare_files(files):
+        # Stop scanning once every framework has been found
+        if not pending:
+            break
+        
+        path = prepared.path
+        content = prepared.content
+        found_keywords = _file_keywords(prepared, keyword_index)
+        dep_kind = _dependency_file_kind(path)
+        
+        for framework in list(pending):
+            if _matches_framework(framework, path, content, found_keywords, dep_kind):
+                pending.discard(framework)
                 detected.add(framework)
-                break
-            
-            # Check specific files
-            if "files" in patterns:
-                for file_pattern in patterns["files"]:
-                    if file_pattern in path:
-                        detected.add(framework)
-                        break
     
     return sorted(list(detected))
 
 
-def detect_databases(files: List[Dict[str, str]]) -> List[str]:
+def detect_databases(
+    files: List[Dict[str, str]],
+    keyword_index: Optional[Dict[str, FrozenSet[str]]] = None
+) -> List[str]:
     """
     Detect databases used in the repository.
     
     Args:
-        files: List of file objects with 'path', 'extension', 'content' keys
+        files: List of file objects with 'path', 'extension', 'content' keys,
+            or PreparedFile records from prepare_files
+        keyword_index: Optional mapping of path to content keywords, filled as
+            files are scanned; pass the same dict to both detectors to scan
+            each file once
         
     Returns:
         List of detected database names
     """
     detected = set()
+    pending = set(DATABASE_PATTERNS)
     
-    for database, patterns in DATABASE_PATTERNS.items():
-        for file_obj in files:
-            path = file_obj.get("path", "")
-            content = file_obj.get("content", "")
-            
-            # Check imports
-            if "imports" in patterns and _check_imports(content, patterns["imports"]):
-                detected.add(database)
-                break
-            
-            # Check dependencies
-            if "dependencies" in patterns and _check_dependencies(path, content, patterns["dependencies"]):
+    for prepared in prepare_files(files):
+        # Stop scanning once every database has been found
+        if not pending:
+            break
+        
+        path = prepared.path
+        content = prepared.content
+        found_keywords = _file_keywords(prepared, keyword_index)
+        dep_kind = _dependency_file_kind(path)
+        
+        for database in list(pending):
+            if _matches_database(database, path, content, found_keywords, dep_kind):
+                pending.discard(database)
                 detected.add(database)
-                break
-            
-            # Check config strings
-            if "config" in patterns:
-                for config_pattern in patterns["config"]:
-                    if config_pattern in content:
-                        detected.add(database)
-                        break
-            
-            # Check file extensions
-            if "files" in patterns:
-                for file_pattern in patterns["files"]:
-                    if path.endswith(file_pattern):
-                        detected.add(database)
-                        break
     
     return sorted(list(detected))
 
@@ -258,37 +446,47 @@ def detect_infrastructure(files: List[Dict[str, str]]) -> List[str]:
     Detect infrastructure and DevOps tools used in the repository.
     
     Args:
-        files: List of file objects with 'path', 'extension', 'content' keys
+        files: List of file objects with 'path', 'extension', 'content' keys,
+            or PreparedFile records from prepare_files
         
     Returns:
         List of detected infrastructure tool names
     """
     detected = set()
+    pending = set(INFRA_PATTERNS)
+    
+    for prepared in prepare_files(files):
+        # Stop scanning once every tool has been found
+        if not pending:
+            break
+        
+        path = prepared.path
+        content = prepared.content
+        
+        for tool in list(pending):
+            if _matches_infrastructure(tool, path, content):
+                pending.discard(tool)
+                detected.add(tool)
+    
+    return sorted(list(detected))
+
+
+def detect_stack(files: List[Dict[str, str]]) -> Dict[str, List[str]]:
+    """
+    Detect frameworks, databases and infrastructure tools together.
+    
+    Args:
+        files: List of file objects with 'path', 'extension', 'content' keys,
+            or PreparedFile records from prepare_files
+        
+    Returns:
+        Dictionary with 'frameworks', 'databases' and 'infrastructure' lists
+    """
+    prepared_files = prepare_files(files)
+    keyword_index: Dict[str, FrozenSet[str]] = {}
     
-    for tool, patterns in INFRA_PATTERNS.items():
-        for file_obj in files:
-            path = file_obj.get("path", "")
-            content = file_obj.get("content", "")
-            
-            # Check specific files
-            if "files" in patterns:
-                for file_pattern in patterns["files"]:
-                    if file_pattern in path:
-                        detected.add(tool)
-                        break
-            
-            # Check extensions
-            if "extensions" in patterns:
-                for ext in patterns["extensions"]:
-                    if path.endswith(ext):
-                        # If content patterns exist, check them too
-                        if "content" in patterns:
-                            for content_pattern in patterns["content"]:
-                                if content_pattern in content:
-                                    detected.add(tool)
-                                    break
-                        else:
-                            detected.add(tool)
-                        break
-    
-    return sorted(list(detected))
\ No newline at end of file
+    return {
+        "frameworks": detect_frameworks(prepared_files, keyword_index),
+        "databases": detect_databases(prepared_files, keyword_index),
+        "infrastructure": detect_infrastructure(prepared_files),
+    }
@@ -3,7 +3,9 @@ Structure analyzer for RepoAnalyzer.
 Classifies repository folders based on their content and naming patterns.
 """
 from typing import Dict, List, Set
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+from analysis.file_index import PreparedFile, prepare_files
 
 
 # Folder name patterns for classification
@@ -42,12 +44,9 @@ BACKEND_EXTENSIONS = {".py", ".go", ".java", ".rs", ".rb", ".php"}
 CONFIG_EXTENSIONS = {".yaml", ".yml", ".json", ".toml", ".ini", ".env", ".config"}
 SCRIPT_EXTENSIONS = {".sh", ".bash", ".zsh", ".ps1"}
 
-
-def _get_folder_from_path(path: str) -> str:
-    """Extract the top-level folder from a file path."""
-    if "/" not in path:
-        return ""
-    return path.split("/")[0]
+# (mid-path, trailing) needles for framework folder names, built once
+_FRONTEND_NEEDLES = tuple((f"/{p}/", f"/{p}") for p in FOLDER_PATTERNS["frontend"]["frameworks"])
+_BACKEND_NEEDLES = tuple((f"/{p}/", f"/{p}") for p in FOLDER_PATTERNS["backend"]["frameworks"])
 
 
 def _classify_by_name(folder: str) -> str:
@@ -63,49 +62,36 @@ def _classify_by_name(folder: str) -> str:
     return "misc"
 
 
-def _classify_by_content(folder: str, files: List[Dict[str, str]]) -> str:
+def _classify_by_content(folder_files: List[PreparedFile], extension_counts: Dict[str, int]) -> str:
     """Classify folder based on file types and patterns inside it."""
-    folder_files = [f for f in files if f.get("path", "").startswith(folder + "/")]
-    
     if not folder_files:
         return "misc"
     
-    # Count file types
-    frontend_count = 0
-    backend_count = 0
-    config_count = 0
-    script_count = 0
-    
-    # Check for framework-specific patterns
-    has_frontend_patterns = False
+    # First pass: framework folder patterns. A frontend pattern decides the
+    # classification on its own, so return as soon as one is seen.
     has_backend_patterns = False
     
-    for file_obj in folder_files:
-        path = file_obj.get("path", "")
-        extension = "." + path.rsplit(".", 1)[-1] if "." in path else ""
-        
-        # Count by extension
-        if extension in FRONTEND_EXTENSIONS:
-            frontend_count += 1
-        if extension in BACKEND_EXTENSIONS:
-            backend_count += 1
-        if extension in CONFIG_EXTENSIONS:
-            config_count += 1
-        if extension in SCRIPT_EXTENSIONS:
-            script_count += 1
+    for prepared in folder_files:
+        path_lower = prepared.path.lower()
         
-        # Check framework patterns
-        path_lower = path.lower()
-        for pattern in FOLDER_PATTERNS["frontend"]["frameworks"]:
-            if f"/{pattern}/" in path_lower or path_lower.endswith(f"/{pattern}"):
-                has_frontend_patterns = True
+        for mid, tail in _FRONTEND_NEEDLES:
+            if mid in path_lower or path_lower.endswith(tail):
+                return "frontend"
         
-        for pattern in FOLDER_PATTERNS["backend"]["frameworks"]:
-            if f"/{pattern}/" in path_lower or path_lower.endswith(f"/{pattern}"):
-                has_backend_patterns = True
+        if not has_backend_patterns:
+            for mid, tail in _BACKEND_NEEDLES:
+                if mid in path_lower or path_lower.endswith(tail):
+                    has_backend_patterns = True
+                    break
+    
+    # Count file types from the folder's extension index
+    frontend_count = sum(extension_counts[e] for e in FRONTEND_EXTENSIONS)
+    backend_count = sum(extension_counts[e] for e in BACKEND_EXTENSIONS)
+    config_count = sum(extension_counts[e] for e in CONFIG_EXTENSIONS)
+    script_count = sum(extension_counts[e] for e in SCRIPT_EXTENSIONS)
     
     # Classify based on content
-    if has_frontend_patterns or (frontend_count > backend_count and frontend_count > 2):
+    if frontend_count > backend_count and frontend_count > 2:
         return "frontend"
     
     if has_backend_patterns or (backend_count > frontend_count and backend_count > 2):
@@ -125,7 +111,8 @@ def classify_folders(files: List[Dict[str, str]]) -> Dict[str, Dict[str, any]]:
     Classify repository folders based on content and naming.
     
     Args:
-        files: List of file objects with 'path', 'extension', 'content' keys
+        files: List of file objects with 'path', 'extension', 'content' keys,
+            or PreparedFile records from prepare_files
         
     Returns:
         Dictionary mapping folder paths to their classification and metadata
@@ -133,14 +120,15 @@ def classify_folders(files: List[Dict[str, str]]) -> Dict[str, Dict[str, any]]:
     # Extract unique folders
     folders = set()
     folder_files = defaultdict(list)
+    extension_index = defaultdict(Counter)
     
-    for file_obj in files:
-        path = file_obj.get("path", "")
-        folder = _get_folder_from_path(path)
+    for prepared in prepare_files(files):
+        folder = prepared.folder
         
         if folder:
             folders.add(folder)
-            folder_files[folder].append(file_obj)
+            folder_files[folder].append(prepared)
+            extension_index[folder][prepared.extension] += 1
     
     # Classify each folder
     classifications = {}
@@ -151,12 +139,12 @@ def classify_folders(files: List[Dict[str, str]]) -> Dict[str, Dict[str, any]]:
         
         # If ambiguous, use content-based classification
         if name_classification == "misc":
-            classification = _classify_by_content(folder, files)
+            classification = _classify_by_content(folder_files[folder], extension_index[folder])
         else:
             classification = name_classification
         
         # Count files in folder
-        file_count = len([f for f in files if f.get("path", "").startswith(folder + "/")])
+        file_count = len(folder_files[folder])
         
         classifications[folder] = {
             "role": classification,
@@ -1,5 +1,21 @@
 """Configuration module for RepoAnalyzer."""
 
-from config.settings import GITHUB_TOKEN, GITHUB_API_BASE_URL, REQUEST_TIMEOUT
+from config import settings as _settings
+from config.settings import Settings, get_settings
 
-__all__ = ["GITHUB_TOKEN", "GITHUB_API_BASE_URL", "REQUEST_TIMEOUT"]
+__all__ = [
+    "Settings",
+    "get_settings",
+    "GITHUB_TOKEN",
+    "GITHUB_API_BASE_URL",
+    "REQUEST_TIMEOUT",
+    "GITHUB_POOL_SIZE",
+    "GITHUB_MAX_WORKERS",
+    "GITHUB_CACHE_DIR",
+    "GITHUB_MAX_FILE_SIZE",
+]
+
+
+def __getattr__(name: str):
+    """Resolve legacy setting constants lazily through config.settings."""
+    return getattr(_settings, name)
@@ -1,23 +1,96 @@
 """
 Configuration module for RepoAnalyzer.
 Loads environment variables and exposes project settings.
+
+Settings are read lazily on the first call to get_settings(), so importing
+this module does not touch the .env file or parse any values.
 """
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
-# GitHub Configuration
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
-GITHUB_API_BASE_URL = os.getenv("GITHUB_API_BASE_URL", "https://api.github.com")
-REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "60"))
-
-# LLM Configuration
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq").lower()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "")
-LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "1000"))
-LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.1"))
\ No newline at end of file
+
+@dataclass(frozen=True)
+class Settings:
+    """Project settings resolved from the environment."""
+    
+    # GitHub Configuration
+    github_token: str
+    github_api_base_url: str
+    request_timeout: int
+    github_pool_size: int
+    github_max_workers: int
+    github_cache_dir: str
+    github_max_file_size: int
+    
+    # LLM Configuration
+    llm_provider: str
+    openai_api_key: str
+    groq_api_key: str
+    gemini_api_key: str
+    llm_model_name: str
+    llm_max_tokens: int
+    llm_temperature: float
+    llm_max_input_tokens: int
+    llm_cache_dir: str
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Load environment variables and build the settings once.
+    
+    Returns:
+        Cached Settings instance
+    """
+    # Load environment variables from .env file
+    load_dotenv()
+    
+    return Settings(
+        github_token=os.getenv("GITHUB_TOKEN", ""),
+        github_api_base_url=os.getenv("GITHUB_API_BASE_URL", "https://api.github.com"),
+        request_timeout=int(os.getenv("REQUEST_TIMEOUT", "60")),
+        github_pool_size=int(os.getenv("GITHUB_POOL_SIZE", "20")),
+        github_max_workers=int(os.getenv("GITHUB_MAX_WORKERS", "16")),
+        github_cache_dir=os.getenv("GITHUB_CACHE_DIR", ".repoanalyzer_cache/github"),
+        github_max_file_size=int(os.getenv("GITHUB_MAX_FILE_SIZE", "1048576")),
+        llm_provider=os.getenv("LLM_PROVIDER", "groq").lower(),
+        openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+        groq_api_key=os.getenv("GROQ_API_KEY", ""),
+        gemini_api_key=os.getenv("GEMINI_API_KEY", ""),
+        llm_model_name=os.getenv("LLM_MODEL_NAME", ""),
+        llm_max_tokens=int(os.getenv("LLM_MAX_TOKENS", "1000")),
+        llm_temperature=float(os.getenv("LLM_TEMPERATURE", "0.1")),
+        llm_max_input_tokens=int(os.getenv("LLM_MAX_INPUT_TOKENS", "6000")),
+        llm_cache_dir=os.getenv("LLM_CACHE_DIR", ".repoanalyzer_cache/llm"),
+    )
+
+
+# Legacy constant names, resolved through get_settings() on first access
+_LEGACY_NAMES = {
+    "GITHUB_TOKEN": "github_token",
+    "GITHUB_API_BASE_URL": "github_api_base_url",
+    "REQUEST_TIMEOUT": "request_timeout",
+    "GITHUB_POOL_SIZE": "github_pool_size",
+    "GITHUB_MAX_WORKERS": "github_max_workers",
+    "GITHUB_CACHE_DIR": "github_cache_dir",
+    "GITHUB_MAX_FILE_SIZE": "github_max_file_size",
+    "LLM_PROVIDER": "llm_provider",
+    "OPENAI_API_KEY": "openai_api_key",
+    "GROQ_API_KEY": "groq_api_key",
+    "GEMINI_API_KEY": "gemini_api_key",
+    "LLM_MODEL_NAME": "llm_model_name",
+    "LLM_MAX_TOKENS": "llm_max_tokens",
+    "LLM_TEMPERATURE": "llm_temperature",
+    "LLM_MAX_INPUT_TOKENS": "llm_max_input_tokens",
+    "LLM_CACHE_DIR": "llm_cache_dir",
+}
+
+
+def __getattr__(name: str):
+    """Back-compat access to the old module-level constants."""
+    if name in _LEGACY_NAMES:
+        return getattr(get_settings(), _LEGACY_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
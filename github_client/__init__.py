@@ -1,13 +1,16 @@
 """GitHub ingestion layer for RepoAnalyzer."""
 
-from github_client.client import GitHubClient
+from github_client.client import GitHubClient, RateLimitError, ArchiveError
 from github_client.repo_loader import RepoLoader
-from github_client.filters import is_ignored_path, is_allowed_file, is_binary_file
+from github_client.filters import is_ignored_path, is_allowed_file, is_binary_file, needs_binary_heuristic
 
 __all__ = [
     "GitHubClient",
+    "RateLimitError",
+    "ArchiveError",
     "RepoLoader",
     "is_ignored_path",
     "is_allowed_file",
     "is_binary_file",
+    "needs_binary_heuristic",
 ]
@@ -2,28 +2,171 @@
 GitHub REST API wrapper for RepoAnalyzer.
 Handles API requests with authentication and error handling.
 """
+import hashlib
+import json
+import logging
+import os
+import tarfile
+import threading
 import time
-from typing import Dict, Any, Optional
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 import requests
-from config.settings import GITHUB_TOKEN, GITHUB_API_BASE_URL, REQUEST_TIMEOUT
+from requests.adapters import HTTPAdapter
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Below this many remaining API calls, batch fetches run one at a time
+RATE_LIMIT_LOW_WATERMARK = 50
+
+# Most ETag entries kept in memory; file contents are never cached
+ETAG_CACHE_MAX_ENTRIES = 128
+
+
+class RateLimitError(Exception):
+    """Raised when GitHub rejects a request because the API rate limit is exhausted."""
+
+
+class ArchiveError(Exception):
+    """Raised when the repository tarball cannot be downloaded or read."""
 
 
 class GitHubClient:
     """Wrapper for GitHub REST API interactions."""
     
-    def __init__(self):
-        self.base_url = GITHUB_API_BASE_URL
-        self.timeout = REQUEST_TIMEOUT
+    def __init__(self, cache_dir: Optional[str] = None):
+        settings = get_settings()
+        self.base_url = settings.github_api_base_url
+        self.timeout = settings.request_timeout
+        
+        # ETag entries live in memory and, unless cache_dir is "", are persisted on disk
+        self.cache_dir = settings.github_cache_dir if cache_dir is None else cache_dir
+        self._etag_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._etag_lock = threading.Lock()
+        self.max_workers = settings.github_max_workers
+        self.max_file_size = settings.github_max_file_size
+        self.rate_limit_remaining: Optional[int] = None
         self.session = requests.Session()
         
+        # Size the connection pool so concurrent requests reuse connections
+        adapter = HTTPAdapter(
+            pool_connections=settings.github_pool_size,
+            pool_maxsize=settings.github_pool_size,
+            max_retries=3,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        
         # Attach authorization header if token exists
-        if GITHUB_TOKEN:
+        if settings.github_token:
             self.session.headers.update({
-                "Authorization": f"token {GITHUB_TOKEN}",
+                "Authorization": f"token {settings.github_token}",
                 "Accept": "application/vnd.github.v3+json"
             })
     
-    def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    @staticmethod
+    def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+        """Build the cache key for a request."""
+        return url + "?" + json.dumps(params or {}, sort_keys=True)
+    
+    def _cache_path(self, cache_key: str) -> Optional[str]:
+        """Get the on-disk cache file for a request, or None if disk caching is disabled."""
+        if not self.cache_dir:
+            return None
+        
+        return os.path.join(self.cache_dir, hashlib.sha1(cache_key.encode("utf-8")).hexdigest() + ".json")
+    
+    def _read_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Read a cached response entry from memory, then disk, ignoring missing or corrupt files."""
+        with self._etag_lock:
+            entry = self._etag_cache.get(cache_key)
+            if entry is not None:
+                self._etag_cache.move_to_end(cache_key)
+                return entry
+        
+        cache_path = self._cache_path(cache_key)
+        if not cache_path:
+            return None
+        
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        self._remember(cache_key, entry)
+        return entry
+    
+    def _remember(self, cache_key: str, entry: Dict[str, Any]):
+        """Keep an entry in the bounded in-memory cache, evicting the least recently used."""
+        with self._etag_lock:
+            self._etag_cache[cache_key] = entry
+            self._etag_cache.move_to_end(cache_key)
+            while len(self._etag_cache) > ETAG_CACHE_MAX_ENTRIES:
+                self._etag_cache.popitem(last=False)
+    
+    def _write_cache(self, cache_key: str, response: requests.Response, data: Any):
+        """Store a response body with its validators for later conditional requests."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        
+        entry = {"etag": etag, "last_modified": last_modified, "data": data}
+        self._remember(cache_key, entry)
+        
+        cache_path = self._cache_path(cache_key)
+        if not cache_path:
+            return
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Caching is best-effort
+            pass
+    
+    def _track_rate_limit(self, response: requests.Response):
+        """Record the remaining API quota reported by GitHub."""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.isdigit():
+            self.rate_limit_remaining = int(remaining)
+    
+    def _check_rate_limit(self, response: requests.Response):
+        """Track rate limits and raise RateLimitError for rate-limited responses."""
+        self._track_rate_limit(response)
+        
+        if response.status_code == 403 and "rate limit" in response.text.lower():
+            reset_time = int(response.headers.get("X-RateLimit-Reset", 0))
+            if reset_time:
+                wait_time = max(reset_time - int(time.time()), 0)
+                raise RateLimitError(f"Rate limit exceeded. Resets in {wait_time} seconds.")
+            raise RateLimitError("Rate limit exceeded.")
+    
+    def _check_response(self, response: requests.Response):
+        """Track rate limits and raise for rate-limited or non-200 responses."""
+        # Handle rate limiting
+        self._check_rate_limit(response)
+        
+        # Handle non-200 responses
+        if response.status_code != 200:
+            raise Exception(
+                f"GitHub API error: {response.status_code} - {response.text[:200]}"
+            )
+    
+    def _make_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        cache: bool = True
+    ) -> Dict[str, Any]:
         # Ensure endpoint starts with /
         if not endpoint.startswith("/"):
             endpoint = f"/{endpoint}"
@@ -33,27 +176,31 @@ class GitHubClient:
         
         url = f"{base_url}{endpoint}"
         
-        # Debug - remove after fixing
-        print(f"DEBUG: Full URL = {url}")
+        logger.debug("Requesting %s", url)
+        
+        # Send validators from a previous response so unchanged data costs a 304
+        cache_key = self._cache_key(url, params)
+        cached = self._read_cache(cache_key) if cache else None
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
         
         try:
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
             
-            # Handle rate limiting
-            if response.status_code == 403 and "rate limit" in response.text.lower():
-                reset_time = int(response.headers.get("X-RateLimit-Reset", 0))
-                if reset_time:
-                    wait_time = max(reset_time - int(time.time()), 0)
-                    raise Exception(f"Rate limit exceeded. Resets in {wait_time} seconds.")
-                raise Exception("Rate limit exceeded.")
+            if response.status_code == 304 and cached:
+                self._track_rate_limit(response)
+                return cached["data"]
             
-            # Handle non-200 responses
-            if response.status_code != 200:
-                raise Exception(
-                    f"GitHub API error: {response.status_code} - {response.text[:200]}"
-                )
+            self._check_response(response)
             
-            return response.json()
+            data = response.json()
+            if cache:
+                self._write_cache(cache_key, response, data)
+            return data
             
         except requests.exceptions.Timeout:
             raise Exception(f"Request timed out after {self.timeout} seconds")
@@ -72,10 +219,6 @@ class GitHubClient:
             Repository metadata as JSON
         """
         endpoint = f"/repos/{owner}/{repo}"
-        # DEBUG
-        print(f"DEBUG: Requesting {self.base_url}/{endpoint}")
-        # print(f"DEBUG: Token (last 4): ...{self.token[-4:]}")
-        # DEBUG ENDS
         return self._make_request(endpoint)
     
     def get_repo_tree(self, owner: str, repo: str, branch: str = "main", recursive: bool = True) -> Dict[str, Any]:
@@ -93,16 +236,16 @@ class GitHubClient:
         """
         # Step 1: Get the branch to find the commit SHA
         branch_endpoint = f"/repos/{owner}/{repo}/branches/{branch}"
-        print(f"DEBUG: Getting branch info from {branch_endpoint}")
+        logger.debug("Getting branch info from %s", branch_endpoint)
         
         try:
             branch_data = self._make_request(branch_endpoint)
             commit_sha = branch_data["commit"]["sha"]
-            print(f"DEBUG: Branch '{branch}' resolved to SHA: {commit_sha}")
+            logger.debug("Branch '%s' resolved to SHA: %s", branch, commit_sha)
         except Exception as e:
             # If branch not found, try 'master' as fallback
             if branch == "main":
-                print(f"DEBUG: 'main' branch not found, trying 'master'")
+                logger.debug("'main' branch not found, trying 'master'")
                 branch_endpoint = f"/repos/{owner}/{repo}/branches/master"
                 branch_data = self._make_request(branch_endpoint)
                 commit_sha = branch_data["commit"]["sha"]
@@ -113,7 +256,7 @@ class GitHubClient:
         tree_endpoint = f"/repos/{owner}/{repo}/git/trees/{commit_sha}"
         params = {"recursive": "1"} if recursive else {}
         
-        print(f"DEBUG: Getting tree from {tree_endpoint}")
+        logger.debug("Getting tree from %s", tree_endpoint)
         return self._make_request(tree_endpoint, params)
 
     
@@ -130,4 +273,111 @@ class GitHubClient:
             File content metadata as JSON (includes Base64 encoded content)
         """
         endpoint = f"/repos/{owner}/{repo}/contents/{path}"
-        return self._make_request(endpoint)
+        # File bodies are large and may be private, so they are never cached
+        return self._make_request(endpoint, cache=False)
+    
+    def get_file_contents_batch(
+        self,
+        owner: str,
+        repo: str,
+        paths: List[str],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get content for many files concurrently.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            paths: File paths in repository
+            max_workers: Maximum number of concurrent requests, defaults to GITHUB_MAX_WORKERS
+            
+        Returns:
+            Mapping of path to file content metadata, for files that loaded successfully
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+        
+        # Back off to sequential fetching when close to the rate limit
+        if self.rate_limit_remaining is not None and self.rate_limit_remaining < RATE_LIMIT_LOW_WATERMARK:
+            max_workers = 1
+        
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(self.get_file_content, owner, repo, path): path
+                for path in paths
+            }
+            
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    # Skip files that fail to load
+                    logger.warning("Failed to load %s: %s", path, e)
+        
+        return results
+    
+    def download_repo_tarball(
+        self,
+        owner: str,
+        repo: str,
+        ref: str = "main",
+        include: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Stream the whole repository as a single gzip tarball.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or commit SHA
+            include: Optional path predicate; files it rejects are skipped
+                without being extracted
+            
+        Yields:
+            Tuples of (file path, raw file bytes) for every included regular file
+            no larger than GITHUB_MAX_FILE_SIZE bytes
+            
+        Raises:
+            RateLimitError: If the API rate limit is exhausted
+            ArchiveError: If the tarball cannot be downloaded or read
+        """
+        url = f"{self.base_url.rstrip('/')}/repos/{owner}/{repo}/tarball/{ref}"
+        
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                self._check_rate_limit(response)
+                if response.status_code != 200:
+                    raise ArchiveError(
+                        f"GitHub API error: {response.status_code} - {response.text[:200]}"
+                    )
+                response.raw.decode_content = True
+                
+                with tarfile.open(fileobj=response.raw, mode="r|gz") as tar:
+                    for member in tar:
+                        if not member.isfile():
+                            continue
+                        
+                        # Drop the "<owner>-<repo>-<sha>/" directory GitHub prefixes every entry with
+                        path = member.name.split("/", 1)[1] if "/" in member.name else member.name
+                        if include is not None and not include(path):
+                            continue
+                        
+                        # Skip large files (datasets, bundles, lockfiles), as the contents API does
+                        if member.size > self.max_file_size:
+                            logger.debug("Skipping %s (%d bytes)", path, member.size)
+                            continue
+                        
+                        extracted = tar.extractfile(member)
+                        if extracted is not None:
+                            yield path, extracted.read()
+                            
+        except requests.exceptions.Timeout:
+            raise ArchiveError(f"Request timed out after {self.timeout} seconds")
+        except requests.exceptions.RequestException as e:
+            raise ArchiveError(f"Request failed: {str(e)}")
+        except (tarfile.TarError, zlib.error, EOFError) as e:
+            raise ArchiveError(f"Failed to read repository archive: {str(e)}")
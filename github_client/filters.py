@@ -3,7 +3,7 @@ Centralized filtering rules for RepoAnalyzer.
 Defines rules for ignoring paths and identifying file types.
 """
 import os
-from typing import Set
+from typing import Set, Union
 
 # Directories to ignore
 IGNORED_DIRECTORIES: Set[str] = {
@@ -62,6 +62,22 @@ ALLOWED_EXTENSIONS: Set[str] = {
 }
 
 
+# Allowed extensions that can still hold binary data and so need the full
+# control-byte heuristic. Files with other allowed extensions only get the
+# cheap NUL check.
+MAYBE_BINARY_EXTENSIONS: Set[str] = set()
+
+# Number of leading bytes inspected by is_binary_file
+BINARY_SAMPLE_SIZE = 8192
+
+# UTF-8, UTF-16 LE and UTF-16 BE byte order marks
+TEXT_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+
+# Bytes that count as text in the binary heuristic: everything except the
+# control characters below 32 other than tab, newline and carriage return
+_TEXT_BYTES = bytes(byte for byte in range(256) if byte >= 32 or byte in (9, 10, 13))
+
+
 def is_ignored_path(path: str) -> bool:
     """
     Check if a path should be ignored based on directory rules.
@@ -72,8 +88,8 @@ def is_ignored_path(path: str) -> bool:
     Returns:
         True if path should be ignored, False otherwise
     """
-    path_parts = path.split("/")
-    return any(part in IGNORED_DIRECTORIES for part in path_parts)
+    # Set intersection in C instead of a Python-level any() over the components
+    return not IGNORED_DIRECTORIES.isdisjoint(path.split("/"))
 
 
 def is_allowed_file(path: str) -> bool:
@@ -90,25 +106,51 @@ def is_allowed_file(path: str) -> bool:
     return ext.lower() in ALLOWED_EXTENSIONS
 
 
-def is_binary_file(content: bytes) -> bool:
+def needs_binary_heuristic(path: str) -> bool:
+    """
+    Check if a file's extension calls for the full binary heuristic.
+    
+    Args:
+        path: File path
+        
+    Returns:
+        True if the extension is in MAYBE_BINARY_EXTENSIONS, False otherwise
+    """
+    _, ext = os.path.splitext(path)
+    return ext.lower() in MAYBE_BINARY_EXTENSIONS
+
+
+def is_binary_file(content: Union[bytes, bytearray, memoryview], text_heuristic: bool = True) -> bool:
     """
     Heuristic check for binary content.
     
     Args:
-        content: File content as bytes
+        content: File content as bytes or any bytes-like buffer
+        text_heuristic: Also count control bytes; when False only NUL bytes are checked
         
     Returns:
         True if content appears to be binary, False otherwise
     """
-    # Check for null bytes (common in binary files)
-    if b"\x00" in content:
+    # Memoryviews have no search methods, so copy just the part that is inspected
+    if isinstance(content, memoryview):
+        content = content[:BINARY_SAMPLE_SIZE].tobytes()
+    
+    # A byte order mark means the file is text
+    if content.startswith(TEXT_BOMS):
+        return False
+    
+    # Check for null bytes (common in binary files), only within the first 8KB
+    if content.find(b"\x00", 0, BINARY_SAMPLE_SIZE) != -1:
         return True
     
+    if not text_heuristic:
+        return False
+    
     # Sample first 8KB for text detection
-    sample = content[:8192]
+    sample = content[:BINARY_SAMPLE_SIZE]
     
-    # Count non-text characters
-    non_text_chars = sum(1 for byte in sample if byte < 32 and byte not in (9, 10, 13))
+    # Count non-text characters by deleting every text byte and measuring what is left
+    non_text_chars = len(sample.translate(None, _TEXT_BYTES))
     
     # If more than 30% are non-text characters, consider it binary
     if len(sample) > 0 and (non_text_chars / len(sample)) > 0.3:
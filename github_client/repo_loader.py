@@ -3,12 +3,20 @@ Repository loader for RepoAnalyzer.
 Loads and structures GitHub repository data.
 """
 import base64
+import logging
 import re
 from typing import Dict, List, Optional
 from urllib.parse import urlparse
 
-from github_client.client import GitHubClient
-from github_client.filters import is_ignored_path, is_allowed_file, is_binary_file
+from github_client.client import ArchiveError, GitHubClient
+from github_client.filters import is_ignored_path, is_allowed_file, is_binary_file, needs_binary_heuristic
+
+logger = logging.getLogger(__name__)
+
+
+def _is_wanted_path(path: str) -> bool:
+    """Check whether a repository path passes the ignore and allow-list filters."""
+    return not is_ignored_path(path) and is_allowed_file(path)
 
 
 class RepoLoader:
@@ -75,13 +83,16 @@ class RepoLoader:
             branch = metadata.get("default_branch", "main")
         
         target_branch = branch
-        print(f"DEBUG: Loading files from branch: {target_branch}")
+        logger.debug("Loading files from branch: %s", target_branch)
         
-        # Get repository tree
-        tree_data = self.client.get_repo_tree(owner, repo, target_branch, recursive=True)
-        
-        # Load file contents
-        files = self._load_files(owner, repo, tree_data.get("tree", []))
+        # Load file contents from a single tarball download, falling back to
+        # per-file fetches through the tree API if the archive is unavailable
+        try:
+            files = self._load_files_from_tarball(owner, repo, target_branch)
+        except ArchiveError as e:
+            logger.warning("Tarball download failed, fetching files individually: %s", e)
+            tree_data = self.client.get_repo_tree(owner, repo, target_branch, recursive=True)
+            files = self._load_files(owner, repo, tree_data.get("tree", []))
         
         return {
             "files": files,
@@ -95,10 +106,40 @@ class RepoLoader:
             }
         }
     
+    def _load_files_from_tarball(self, owner: str, repo: str, ref: str) -> List[Dict[str, str]]:
+        """
+        Load and filter file contents from the repository tarball.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or commit SHA
+            
+        Returns:
+            List of dictionaries with 'path' and 'content' keys
+        """
+        files = []
+        
+        # Filtered paths are skipped before their contents are extracted
+        for path, raw_bytes in self.client.download_repo_tarball(owner, repo, ref, include=_is_wanted_path):
+            # Skip binary files; known-text extensions only get the NUL check
+            if is_binary_file(raw_bytes, text_heuristic=needs_binary_heuristic(path)):
+                continue
+            
+            files.append({
+                "path": path,
+                "content": raw_bytes.decode("utf-8", errors="ignore")
+            })
+        
+        return files
+    
     def _load_files(self, owner: str, repo: str, tree: List[Dict]) -> List[Dict[str, str]]:
         """
         Load and filter file contents from repository tree.
         
+        Files are fetched concurrently with GitHubClient.get_file_contents_batch;
+        the result keeps the order of the tree.
+        
         Args:
             owner: Repository owner
             repo: Repository name
@@ -107,7 +148,8 @@ class RepoLoader:
         Returns:
             List of dictionaries with 'path' and 'content' keys
         """
-        files = []  # Changed from dict to list
+        # Filter the tree before fetching anything
+        work = []
         
         for item in tree:
             # Only process blob (file) items
@@ -117,34 +159,56 @@ class RepoLoader:
             path = item.get("path", "")
             
             # Apply filters
-            if is_ignored_path(path) or not is_allowed_file(path):
+            if not _is_wanted_path(path):
+                continue
+            
+            work.append(path)
+        
+        if not work:
+            return []
+        
+        contents = self.client.get_file_contents_batch(owner, repo, work)
+        files = []
+        
+        for path in work:
+            # Files that failed to load are missing from the batch result
+            content_data = contents.pop(path, None)
+            if content_data is None:
                 continue
             
             try:
-                # Fetch file content
-                content_data = self.client.get_file_content(owner, repo, path)
-                
-                # Decode Base64 content
-                encoded_content = content_data.get("content", "")
-                decoded_bytes = base64.b64decode(encoded_content)
-                
-                # Skip binary files
-                if is_binary_file(decoded_bytes):
-                    continue
-                
-                # Decode to UTF-8 text
-                decoded_text = decoded_bytes.decode("utf-8", errors="ignore")
-                
-                # Append as dictionary with path and content
-                files.append({
-                    "path": path,
-                    "content": decoded_text
-                })
-                
-            except Exception as e:
-                # Skip files that fail to load
-                print(f"Warning: Failed to load {path}: {str(e)}")
+                file_obj = self._decode_file(path, content_data.get("content", ""))
+            except ValueError as e:
+                logger.warning("Failed to decode %s: %s", path, e)
                 continue
+            
+            if file_obj is not None:
+                files.append(file_obj)
         
         return files
-
+    
+    @staticmethod
+    def _decode_file(path: str, encoded_content: str) -> Optional[Dict[str, str]]:
+        """
+        Decode a file fetched through the contents API.
+        
+        Args:
+            path: File path in repository
+            encoded_content: Base64 encoded file content
+            
+        Returns:
+            Dictionary with 'path' and 'content' keys, or None for binary files
+        """
+        decoded_bytes = base64.b64decode(encoded_content)
+        
+        # Skip binary files; known-text extensions only get the NUL check
+        if is_binary_file(decoded_bytes, text_heuristic=needs_binary_heuristic(path)):
+            return None
+        
+        # Decode to UTF-8 text
+        decoded_text = decoded_bytes.decode("utf-8", errors="ignore")
+        
+        return {
+            "path": path,
+            "content": decoded_text
+        }
@@ -2,9 +2,43 @@
 Dependency graph builder for RepoAnalyzer.
 Builds file-level dependency graphs based on imports and requires.
 """
-from typing import Dict, List, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import multiprocessing
+import os
 import re
+import threading
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis.file_index import PreparedFile, prepare_files
+
+
+# Python "import module" / "from module import ..." at the start of a line,
+# after optional indentation. Whitespace never spans lines.
+_PY_IMPORT_RE = re.compile(
+    r"^[^\S\n]*(?:import[^\S\n]+([\w.]+)|from[^\S\n]+([\w.]+)[^\S\n]+import)",
+    re.MULTILINE,
+)
+
+# JavaScript/TypeScript "import ... from 'module'", "require('module')" and "import('module')".
+# The first form is a lookahead so it cannot swallow a require() later on the same line.
+_JS_IMPORT_RE = re.compile(
+    r"(?=import\s+.*?from\s+['\"]([^'\"]+)['\"])"
+    r"|require\s*\(['\"]([^'\"]+)['\"]\)"
+    r"|import\s*\(['\"]([^'\"]+)['\"]\)"
+)
+
+
+# Repositories with at least this many files extract imports in a process pool
+PARALLEL_EXTRACTION_MIN_FILES = 500
+
+# Sentinel for import names not yet looked up in a resolver cache
+_UNRESOLVED = object()
+
+# Process pool reused by every graph build, created on first use
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_pool_lock = threading.Lock()
 
 
 class DependencyGraph:
@@ -14,17 +48,39 @@ class DependencyGraph:
         self.nodes: Set[str] = set()
         self.edges: Dict[str, Set[str]] = defaultdict(set)
         self.reverse_edges: Dict[str, Set[str]] = defaultdict(set)
+        
+        # Sorted views, rebuilt only for nodes changed since they were last read
+        self._sorted_nodes: Optional[List[str]] = None
+        self._sorted_up: Dict[str, List[str]] = {}
+        self._sorted_down: Dict[str, List[str]] = {}
+        self._dirty_up: Set[str] = set()
+        self._dirty_down: Set[str] = set()
     
     def add_node(self, node: str):
         """Add a node to the graph."""
-        self.nodes.add(node)
+        if node not in self.nodes:
+            self.nodes.add(node)
+            self._sorted_nodes = None
     
     def add_edge(self, from_node: str, to_node: str):
         """Add a directed edge from one node to another."""
-        self.nodes.add(from_node)
-        self.nodes.add(to_node)
+        self.add_node(from_node)
+        self.add_node(to_node)
         self.edges[from_node].add(to_node)
         self.reverse_edges[to_node].add(from_node)
+        self._dirty_up.add(from_node)
+        self._dirty_down.add(to_node)
+    
+    def _sorted_view(self, node: str, adjacency: Dict[str, Set[str]], cache: Dict[str, List[str]], dirty: Set[str]) -> List[str]:
+        """Return the cached sorted neighbours of a node, re-sorting only if it changed."""
+        if node in dirty:
+            dirty.discard(node)
+            cache.pop(node, None)
+        
+        if node not in cache:
+            cache[node] = sorted(adjacency.get(node, ()))
+        
+        return cache[node]
     
     def get_downstream(self, node: str) -> List[str]:
         """
@@ -36,7 +92,7 @@ class DependencyGraph:
         Returns:
             List of downstream node identifiers
         """
-        return sorted(list(self.reverse_edges.get(node, set())))
+        return list(self._sorted_view(node, self.reverse_edges, self._sorted_down, self._dirty_down))
     
     def get_upstream(self, node: str) -> List[str]:
         """
@@ -48,11 +104,17 @@ class DependencyGraph:
         Returns:
             List of upstream node identifiers
         """
-        return sorted(list(self.edges.get(node, set())))
+        return list(self._sorted_view(node, self.edges, self._sorted_up, self._dirty_up))
+    
+    def degree(self, node: str) -> int:
+        """Get the number of upstream plus downstream connections of a node."""
+        return len(self.edges.get(node, ())) + len(self.reverse_edges.get(node, ()))
     
     def get_all_nodes(self) -> List[str]:
         """Get all nodes in the graph."""
-        return sorted(list(self.nodes))
+        if self._sorted_nodes is None:
+            self._sorted_nodes = sorted(self.nodes)
+        return list(self._sorted_nodes)
     
     def to_dict(self) -> Dict[str, any]:
         """
@@ -62,63 +124,37 @@ class DependencyGraph:
             Dictionary with nodes and edges
         """
         return {
-            "nodes": sorted(list(self.nodes)),
-            "edges": {node: sorted(list(deps)) for node, deps in self.edges.items()},
+            "nodes": self.get_all_nodes(),
+            "edges": {node: self.get_upstream(node) for node in self.edges},
         }
 
 
 def _extract_python_imports(content: str) -> List[str]:
     """Extract import statements from Python code."""
-    imports = []
-    
-    # Pattern for: import module
-    # Pattern for: from module import ...
-    patterns = [
-        r"^import\s+([\w.]+)",
-        r"^from\s+([\w.]+)\s+import",
-    ]
-    
-    for line in content.split("\n"):
-        line = line.strip()
-        for pattern in patterns:
-            match = re.match(pattern, line)
-            if match:
-                module = match.group(1)
-                # Get the top-level module
-                top_module = module.split(".")[0]
-                imports.append(top_module)
-                break
-    
-    return list(set(imports))
+    # Get the top-level module of each import
+    return list({
+        (match.group(1) or match.group(2)).partition(".")[0]
+        for match in _PY_IMPORT_RE.finditer(content)
+    })
 
 
 def _extract_js_imports(content: str) -> List[str]:
     """Extract import/require statements from JavaScript/TypeScript code."""
-    imports = []
+    imports = set()
+    
+    for match in _JS_IMPORT_RE.finditer(content):
+        module = match.group(1) or match.group(2) or match.group(3)
+        
+        # Skip relative imports (starting with . or /)
+        if not module.startswith((".", "/")):
+            # Get the package name (first part before /), keeping the scope for @scope/name
+            parts = module.split("/", 2)
+            package = parts[0]
+            if package.startswith("@") and len(parts) > 1:
+                package = package + "/" + parts[1]
+            imports.add(package)
     
-    # Patterns for:
-    # import ... from 'module'
-    # require('module')
-    # import('module')
-    patterns = [
-        r"import\s+.*?from\s+['\"]([^'\"]+)['\"]",
-        r"require\s*\(['\"]([^'\"]+)['\"]\)",
-        r"import\s*\(['\"]([^'\"]+)['\"]\)",
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, content)
-        for match in matches:
-            # Skip relative imports (starting with . or /)
-            if not match.startswith(".") and not match.startswith("/"):
-                # Get the package name (first part before /)
-                package = match.split("/")[0]
-                # Remove @ prefix if present
-                if package.startswith("@") and "/" in match:
-                    package = match.split("/")[0] + "/" + match.split("/")[1]
-                imports.append(package)
-    
-    return list(set(imports))
+    return list(imports)
 
 
 def _normalize_path(file_path: str) -> str:
@@ -131,73 +167,191 @@ def _normalize_path(file_path: str) -> str:
     return file_path.replace("/", ".")
 
 
-def _resolve_import_to_file(import_name: str, all_files: List[str]) -> str:
+def _build_segment_index(normalized_files: Dict[str, str]) -> Dict[str, str]:
     """
-    Try to resolve an import name to an actual file in the repository.
+    Index every contiguous run of dotted segments of each normalized path.
+    
+    "a.b.c" is indexed under "a.b.c", "a.b", "b.c", "a", "b" and "c". The
+    first file in repository order wins for each key.
+    
+    Args:
+        normalized_files: Mapping of normalized module path to file path
+        
+    Returns:
+        Mapping of segment run to file path
+    """
+    segment_index = {}
+    
+    for norm_path, orig_path in normalized_files.items():
+        segments = norm_path.split(".")
+        for start in range(len(segments)):
+            for end in range(start + 1, len(segments) + 1):
+                segment_index.setdefault(".".join(segments[start:end]), orig_path)
+    
+    return segment_index
+
+
+def _make_resolver(all_files: List[str]) -> Callable[[str], Optional[str]]:
+    """
+    Build an import resolver over the repository's files.
+    
+    The path set, normalized module map and segment index are built once and
+    shared by every call, and each import name is resolved at most once.
     
     Args:
-        import_name: Import/module name
         all_files: List of all file paths in the repo
         
     Returns:
-        Matching file path or None
+        Function mapping an import/module name to a matching file path or None
     """
-    # Normalize files
+    all_file_set = set(all_files)
     normalized_files = {_normalize_path(f): f for f in all_files}
+    segment_index = _build_segment_index(normalized_files)
     
-    # Direct match
-    if import_name in normalized_files.values():
-        return import_name
-    
-    # Try normalized match
-    if import_name in normalized_files:
-        return normalized_files[import_name]
+    # Resolved file (or None) per import name
+    resolve_cache: Dict[str, Optional[str]] = {}
     
-    # Try partial match (check if any file path contains the import name)
-    for norm_path, orig_path in normalized_files.items():
-        if import_name in norm_path or norm_path.endswith(import_name):
-            return orig_path
+    def resolve(import_name: str) -> Optional[str]:
+        resolved_file = resolve_cache.get(import_name, _UNRESOLVED)
+        if resolved_file is not _UNRESOLVED:
+            return resolved_file
+        
+        # Direct match
+        if import_name in all_file_set:
+            resolved_file = import_name
+        # Try normalized match
+        elif import_name in normalized_files:
+            resolved_file = normalized_files[import_name]
+        # Try partial match (any file whose module path contains the import name as whole segments)
+        else:
+            resolved_file = segment_index.get(import_name)
+        
+        resolve_cache[import_name] = resolved_file
+        return resolved_file
     
+    return resolve
+
+
+def _import_language(file_path: str) -> Optional[str]:
+    """Get the import syntax ("python" or "js") used by a file, or None."""
+    if file_path.endswith(".py"):
+        return "python"
+    if file_path.endswith((".js", ".jsx", ".ts", ".tsx")):
+        return "js"
     return None
 
 
+def _extract_imports_for_file(prepared: PreparedFile) -> Tuple[str, List[str]]:
+    """
+    Extract the imports of a single file.
+    
+    Args:
+        prepared: PreparedFile record
+        
+    Returns:
+        Tuple of (file path, import names), with an empty path for files to skip
+    """
+    file_path = prepared.path
+    content = prepared.content
+    
+    if not file_path or not content:
+        return "", []
+    
+    # Detect language and extract imports
+    imports = []
+    language = _import_language(file_path)
+    
+    if language == "python":
+        imports = _extract_python_imports(content)
+    elif language == "js":
+        imports = _extract_js_imports(content)
+    
+    return file_path, imports
+
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared import extraction pool.
+    
+    Workers are spawned rather than forked, since forking a threaded
+    process such as the Streamlit server can deadlock the children.
+    """
+    global _extraction_pool
+    
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        return _extraction_pool
+
+
+def _discard_extraction_pool(pool: ProcessPoolExecutor):
+    """Drop a broken extraction pool so the next build starts a fresh one."""
+    global _extraction_pool
+    
+    with _extraction_pool_lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
 def build_dependency_graph(files: List[Dict[str, str]]) -> DependencyGraph:
     """
     Build a file-level dependency graph from repository files.
     
     Args:
-        files: List of file objects with 'path', 'extension', 'content' keys
+        files: List of file objects with 'path', 'extension', 'content' keys,
+            or PreparedFile records from prepare_files
         
     Returns:
         DependencyGraph object representing file dependencies
     """
     graph = DependencyGraph()
+    prepared_files = prepare_files(files)
+    
+    # Index all file paths once for import resolution
+    resolve = _make_resolver([prepared.path for prepared in prepared_files])
     
-    # Get all file paths
-    all_file_paths = [f.get("path", "") for f in files]
+    # Files with identical content in the same language (vendored or generated
+    # copies) share one extraction. Keys hold the existing content strings, so
+    # the map costs no extra copies of file content.
+    file_keys = []
+    representatives = {}
     
-    # Process each file
-    for file_obj in files:
-        file_path = file_obj.get("path", "")
-        content = file_obj.get("content", "")
+    for prepared in prepared_files:
+        file_path = prepared.path
+        content = prepared.content
         
         if not file_path or not content:
             continue
         
+        key = (_import_language(file_path), content)
+        file_keys.append((file_path, key))
+        representatives.setdefault(key, prepared)
+    
+    unique_files = list(representatives.values())
+    
+    # Extract imports per distinct file, in parallel for large repositories on multi-core machines
+    if len(unique_files) >= PARALLEL_EXTRACTION_MIN_FILES and (os.cpu_count() or 1) > 1:
+        executor = _get_extraction_pool()
+        try:
+            extracted = list(executor.map(_extract_imports_for_file, unique_files, chunksize=32))
+        except BrokenProcessPool:
+            # A worker died; fall back to extracting in this process
+            _discard_extraction_pool(executor)
+            extracted = [_extract_imports_for_file(prepared) for prepared in unique_files]
+    else:
+        extracted = [_extract_imports_for_file(prepared) for prepared in unique_files]
+    
+    imports_by_key = {key: imports for key, (_, imports) in zip(representatives, extracted)}
+    
+    # Build the graph serially from the extracted imports
+    for file_path, key in file_keys:
         # Add node for this file
         graph.add_node(file_path)
         
-        # Detect language and extract imports
-        imports = []
-        
-        if file_path.endswith(".py"):
-            imports = _extract_python_imports(content)
-        elif file_path.endswith((".js", ".jsx", ".ts", ".tsx")):
-            imports = _extract_js_imports(content)
-        
         # Resolve imports to actual files
-        for import_name in imports:
-            resolved_file = _resolve_import_to_file(import_name, all_file_paths)
+        for import_name in imports_by_key[key]:
+            resolved_file = resolve(import_name)
             if resolved_file and resolved_file != file_path:
                 graph.add_edge(file_path, resolved_file)
     
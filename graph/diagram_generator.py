@@ -2,11 +2,23 @@
 Mermaid diagram generator for RepoAnalyzer.
 Converts graphs and flows into Mermaid diagram syntax.
 """
+import heapq
+from functools import lru_cache
 from typing import Dict, List
 from graph.dependency_graph import DependencyGraph
 from graph.flow_builder import ExecutionFlow
 
 
+# ASCII translation for node ids: separators become "_", other
+# non-alphanumeric characters are deleted, alphanumerics are kept
+_NODE_ID_TABLE = {
+    code: ("_" if chr(code) in "/.- " else None)
+    for code in range(128)
+    if not (chr(code).isalnum() or chr(code) == "_")
+}
+
+
+@lru_cache(maxsize=4096)
 def _sanitize_node_id(node_id: str) -> str:
     """
     Sanitize node ID for Mermaid syntax.
@@ -17,10 +29,11 @@ def _sanitize_node_id(node_id: str) -> str:
     Returns:
         Sanitized identifier safe for Mermaid
     """
-    # Replace special characters with underscores
-    sanitized = node_id.replace("/", "_").replace(".", "_").replace("-", "_").replace(" ", "_")
-    # Remove any remaining special characters
-    sanitized = "".join(c for c in sanitized if c.isalnum() or c == "_")
+    # Replace separators with underscores and drop other ASCII punctuation in one pass
+    sanitized = node_id.translate(_NODE_ID_TABLE)
+    # Non-ASCII characters survive only if they are alphanumeric
+    if not sanitized.isascii():
+        sanitized = "".join(c for c in sanitized if c.isalnum() or c == "_")
     return sanitized
 
 
@@ -48,16 +61,8 @@ def generate_dependency_diagram(graph: DependencyGraph, max_nodes: int = 20) ->
     all_nodes = graph.get_all_nodes()
     
     if len(all_nodes) > max_nodes:
-        # Prioritize nodes with most connections
-        node_importance = {}
-        for node in all_nodes:
-            upstream = len(graph.get_upstream(node))
-            downstream = len(graph.get_downstream(node))
-            node_importance[node] = upstream + downstream
-        
-        # Sort by importance and take top nodes
-        sorted_nodes = sorted(node_importance.items(), key=lambda x: x[1], reverse=True)
-        nodes_to_include = [n[0] for n in sorted_nodes[:max_nodes]]
+        # Prioritize nodes with most connections; nlargest keeps ties in name order
+        nodes_to_include = heapq.nlargest(max_nodes, all_nodes, key=graph.degree)
     else:
         nodes_to_include = all_nodes
     
@@ -69,17 +74,19 @@ def generate_dependency_diagram(graph: DependencyGraph, max_nodes: int = 20) ->
         node_map[node] = node_id
         lines.append(f"    {node_id}[{node_label}]")
     
-    # Add edges
+    # Add edges; node_map doubles as the membership test. Distinct paths can
+    # sanitize to the same id, so repeated id pairs are still skipped.
     edges_added = set()
-    for node in nodes_to_include:
-        node_id = node_map[node]
+    for node, node_id in node_map.items():
         for dep in graph.get_upstream(node):
-            if dep in node_map:
-                dep_id = node_map[dep]
-                edge_key = (node_id, dep_id)
-                if edge_key not in edges_added:
-                    lines.append(f"    {node_id} --> {dep_id}")
-                    edges_added.add(edge_key)
+            dep_id = node_map.get(dep)
+            if dep_id is None:
+                continue
+            
+            edge_key = (node_id, dep_id)
+            if edge_key not in edges_added:
+                lines.append(f"    {node_id} --> {dep_id}")
+                edges_added.add(edge_key)
     
     # Add styling
     lines.append("")
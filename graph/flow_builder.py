@@ -2,16 +2,74 @@
 Execution flow builder for RepoAnalyzer.
 Builds high-level execution flows from entry points through the system.
 """
-from typing import Dict, List, Set
+from typing import Dict, List, NamedTuple, Set
 from collections import defaultdict
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FolderInfo(NamedTuple):
+    """The fields of a folder summary that the flow builder reads."""
+    
+    folder: str
+    role: str
 
 
 class ExecutionFlow:
     """Represents a high-level execution flow."""
     
+    __slots__ = (
+        "stage_ids",
+        "stage_types",
+        "stage_components",
+        "stage_descriptions",
+        "connection_sources",
+        "connection_targets",
+        "connection_labels",
+    )
+    
     def __init__(self):
-        self.stages: List[Dict[str, any]] = []
-        self.connections: List[Dict[str, str]] = []
+        # Stages and connections are stored column-wise; dicts are built on demand
+        self.stage_ids: List[str] = []
+        self.stage_types: List[str] = []
+        self.stage_components: List[List[str]] = []
+        self.stage_descriptions: List[str] = []
+        self.connection_sources: List[str] = []
+        self.connection_targets: List[str] = []
+        self.connection_labels: List[str] = []
+    
+    @property
+    def stages(self) -> List[Dict[str, any]]:
+        """Stages as a list of dictionaries."""
+        return [
+            {
+                "id": stage_id,
+                "type": stage_type,
+                "components": components,
+                "description": description,
+            }
+            for stage_id, stage_type, components, description in zip(
+                self.stage_ids, self.stage_types, self.stage_components, self.stage_descriptions
+            )
+        ]
+    
+    @property
+    def connections(self) -> List[Dict[str, str]]:
+        """Connections as a list of dictionaries."""
+        return [
+            {
+                "from": from_stage,
+                "to": to_stage,
+                "label": label,
+            }
+            for from_stage, to_stage, label in zip(
+                self.connection_sources, self.connection_targets, self.connection_labels
+            )
+        ]
     
     def add_stage(self, stage_id: str, stage_type: str, components: List[str], description: str = ""):
         """
@@ -23,12 +81,10 @@ class ExecutionFlow:
             components: List of files/modules in this stage
             description: Optional description
         """
-        self.stages.append({
-            "id": stage_id,
-            "type": stage_type,
-            "components": components,
-            "description": description,
-        })
+        self.stage_ids.append(stage_id)
+        self.stage_types.append(stage_type)
+        self.stage_components.append(components)
+        self.stage_descriptions.append(description)
     
     def add_connection(self, from_stage: str, to_stage: str, label: str = ""):
         """
@@ -39,11 +95,9 @@ class ExecutionFlow:
             to_stage: Target stage ID
             label: Optional label for the connection
         """
-        self.connections.append({
-            "from": from_stage,
-            "to": to_stage,
-            "label": label,
-        })
+        self.connection_sources.append(from_stage)
+        self.connection_targets.append(to_stage)
+        self.connection_labels.append(label)
     
     def to_dict(self) -> Dict[str, any]:
         """
@@ -56,73 +110,61 @@ class ExecutionFlow:
             "stages": self.stages,
             "connections": self.connections,
         }
-
-
-def _identify_backend_components(
-    folder_summaries: List[Dict[str, str]],
-    frameworks: List[str]
-) -> List[str]:
-    """Identify backend components from folder summaries."""
-    backend_components = []
-    
-    for summary in folder_summaries:
-        role = summary.get("role", "")
-        folder = summary.get("folder", "")
-        
-        # Check if folder is backend-related
-        if role in ["backend", "api", "services"]:
-            backend_components.append(folder)
     
-    return backend_components
+    def to_json(self) -> bytes:
+        """
+        Serialize the flow to UTF-8 encoded JSON.
+        
+        Returns:
+            JSON bytes of the dictionary representation
+        """
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 
-def _identify_database_components(
-    folder_summaries: List[Dict[str, str]],
-    databases: List[str]
-) -> List[str]:
-    """Identify database-related components."""
-    db_components = []
-    
-    for summary in folder_summaries:
-        role = summary.get("role", "")
-        folder = summary.get("folder", "")
-        
-        # Check if folder is database-related
-        if role in ["database", "models"]:
-            db_components.append(folder)
-    
-    # Add detected databases
-    db_components.extend(databases)
-    
-    return db_components
+# Frameworks whose entry points render a UI
+FRONTEND_FRAMEWORKS = frozenset({"React", "Vue", "Angular", "Next.js", "Svelte"})
 
+# Infrastructure that implies container orchestration
+CONTAINER_INFRASTRUCTURE = frozenset({"Docker", "Kubernetes"})
 
-def _identify_frontend_components(folder_summaries: List[Dict[str, str]]) -> List[str]:
-    """Identify frontend components."""
-    frontend_components = []
-    
-    for summary in folder_summaries:
-        role = summary.get("role", "")
-        folder = summary.get("folder", "")
-        
-        if role in ["frontend", "client", "ui"]:
-            frontend_components.append(folder)
-    
-    return frontend_components
+# Folder role -> execution flow layer
+ROLE_MAP = {
+    "backend": "backend",
+    "api": "backend",
+    "services": "backend",
+    "frontend": "frontend",
+    "client": "frontend",
+    "ui": "frontend",
+    "database": "database",
+    "models": "database",
+    "middleware": "middleware",
+    "utils": "middleware",
+    "utilities": "middleware",
+    "scripts": "middleware",
+}
 
 
-def _identify_middleware_components(folder_summaries: List[Dict[str, str]]) -> List[str]:
-    """Identify middleware/utility components."""
-    middleware_components = []
+def _bucket_folders_by_role(folders: List[FolderInfo]) -> Dict[str, List[str]]:
+    """
+    Group folders by the execution flow layer their role belongs to.
     
-    for summary in folder_summaries:
-        role = summary.get("role", "")
-        folder = summary.get("folder", "")
+    Args:
+        folders: Folder records from the folder summaries
         
-        if role in ["middleware", "utils", "utilities", "scripts"]:
-            middleware_components.append(folder)
+    Returns:
+        Dictionary mapping "backend", "frontend", "database" and "middleware"
+        to folder paths, in summary order
+    """
+    buckets = {"backend": [], "frontend": [], "database": [], "middleware": []}
+    
+    for info in folders:
+        bucket = ROLE_MAP.get(info.role)
+        if bucket:
+            buckets[bucket].append(info.folder)
     
-    return middleware_components
+    return buckets
 
 
 def build_execution_flow(
@@ -146,6 +188,11 @@ def build_execution_flow(
         ExecutionFlow object representing the high-level flow
     """
     flow = ExecutionFlow()
+    folders = [
+        FolderInfo(summary.get("folder", ""), summary.get("role", ""))
+        for summary in folder_summaries
+    ]
+    buckets = _bucket_folders_by_role(folders)
     
     # Stage 1: Entry Points
     entry_files = [e["path"] for e in entrypoints.get("application_files", [])]
@@ -161,7 +208,7 @@ def build_execution_flow(
         )
     
     # Stage 2: Frontend (if exists)
-    frontend_components = _identify_frontend_components(folder_summaries)
+    frontend_components = buckets["frontend"]
     if frontend_components:
         flow.add_stage(
             stage_id="frontend",
@@ -171,11 +218,11 @@ def build_execution_flow(
         )
         
         # Connect entry to frontend if web framework detected
-        if all_entries and any(fw in ["React", "Vue", "Angular", "Next.js", "Svelte"] for fw in frameworks):
+        if all_entries and not FRONTEND_FRAMEWORKS.isdisjoint(frameworks):
             flow.add_connection("entry", "frontend", "Renders UI")
     
     # Stage 3: Backend/API
-    backend_components = _identify_backend_components(folder_summaries, frameworks)
+    backend_components = buckets["backend"]
     if backend_components:
         flow.add_stage(
             stage_id="backend",
@@ -191,7 +238,7 @@ def build_execution_flow(
             flow.add_connection("entry", "backend", "Processes requests")
     
     # Stage 4: Middleware/Utils (if significant)
-    middleware_components = _identify_middleware_components(folder_summaries)
+    middleware_components = buckets["middleware"]
     if middleware_components and len(middleware_components) >= 2:
         flow.add_stage(
             stage_id="middleware",
@@ -204,7 +251,7 @@ def build_execution_flow(
             flow.add_connection("backend", "middleware", "Uses utilities")
     
     # Stage 5: Database
-    db_components = _identify_database_components(folder_summaries, databases)
+    db_components = buckets["database"] + databases
     if db_components:
         flow.add_stage(
             stage_id="database",
@@ -223,7 +270,7 @@ def build_execution_flow(
     external_services = []
     
     # Check for Docker, K8s, or cloud infrastructure
-    if any(infra in ["Docker", "Kubernetes"] for infra in infrastructure):
+    if not CONTAINER_INFRASTRUCTURE.isdisjoint(infrastructure):
         external_services.append("Container orchestration")
     
     # Check for message queues or caching in databases
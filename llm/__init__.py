@@ -1,12 +1,14 @@
 """LLM interaction layer for RepoAnalyzer."""
 
-from llm.client import LLMClient
+from llm.client import LLMClient, get_llm_client, reset_llm_client
 from llm.file_summarizer import FileSummarizer
 from llm.folder_summarizer import FolderSummarizer
 from llm.repo_summarizer import RepoSummarizer
 
 __all__ = [
     "LLMClient",
+    "get_llm_client",
+    "reset_llm_client",
     "FileSummarizer",
     "FolderSummarizer",
     "RepoSummarizer",
@@ -2,69 +2,95 @@
 Unified LLM client for RepoAnalyzer.
 Provides a single interface for multiple LLM providers.
 """
-from typing import Optional
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Union
+import asyncio
+import hashlib
+import json
+import os
+import threading
 import time
-from config.settings import (
-    LLM_PROVIDER,
-    OPENAI_API_KEY,
-    GROQ_API_KEY,
-    GEMINI_API_KEY,
-    LLM_MODEL_NAME,
-    LLM_MAX_TOKENS,
-    LLM_TEMPERATURE,
-)
+import weakref
+from config.settings import get_settings
+from llm.tokens import count_tokens
+
+# Maximum number of prompt responses kept in memory per client
+RESPONSE_CACHE_SIZE = 512
+
+# Retry policy for rate-limited (429) or failed (5xx) async requests
+ASYNC_MAX_RETRIES = 3
+ASYNC_RETRY_BASE_DELAY = 1.0
 
 
 class LLMClient:
     """Unified interface for multiple LLM providers."""
     
-    def __init__(self):
-        self.provider = LLM_PROVIDER
-        self.model_name = LLM_MODEL_NAME
-        self.max_tokens = LLM_MAX_TOKENS
-        self.temperature = LLM_TEMPERATURE
-        
-        # Initialize the appropriate provider client
-        if self.provider == "openai":
-            self._client = self._init_openai()
-        elif self.provider == "groq":
-            self._client = self._init_groq()
-        elif self.provider == "gemini":
-            self._client = self._init_gemini()
-        else:
+    def __init__(self, provider: Optional[str] = None):
+        self.settings = get_settings()
+        self.provider = (provider or self.settings.llm_provider).lower()
+        self.model_name = self.settings.llm_model_name
+        self.max_tokens = self.settings.llm_max_tokens
+        self.temperature = self.settings.llm_temperature
+        
+        # LRU cache of responses keyed by request digest, backed by an
+        # on-disk cache that survives across runs unless LLM_CACHE_DIR is ""
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_dir = self.settings.llm_cache_dir
+        
+        # Async SDK clients used by agenerate(), one per event loop since each
+        # connection pool is bound to the loop that created it; close with aclose()
+        self._async_client_factory = None
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._async_clients_lock = threading.Lock()
+        
+        # Provider -> (client initializer, streaming generator, async generator)
+        providers = {
+            "openai": (self._init_openai, self._stream_openai, self._agenerate_openai),
+            "groq": (self._init_groq, self._stream_groq, self._agenerate_groq),
+            "gemini": (self._init_gemini, self._stream_gemini, self._agenerate_gemini),
+        }
+        if self.provider not in providers:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
+        
+        # Initialize the appropriate provider client and bind its generators once
+        init_fn, self._stream_fn, self._agenerate_fn = providers[self.provider]
+        self._client = init_fn()
     
     def _init_openai(self):
         """Initialize OpenAI client."""
         try:
-            from openai import OpenAI
+            from openai import AsyncOpenAI, OpenAI
         except ImportError:
             raise ImportError("OpenAI package not installed. Run: pip install openai")
         
-        if not OPENAI_API_KEY:
+        if not self.settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY not set in environment")
         
         # Set default model if not specified
         if not self.model_name:
             self.model_name = "gpt-4o-mini"
         
-        return OpenAI(api_key=OPENAI_API_KEY)
+        self._async_client_factory = partial(AsyncOpenAI, api_key=self.settings.openai_api_key)
+        return OpenAI(api_key=self.settings.openai_api_key)
     
     def _init_groq(self):
         """Initialize Groq client."""
         try:
-            from groq import Groq
+            from groq import AsyncGroq, Groq
         except ImportError:
             raise ImportError("Groq package not installed. Run: pip install groq")
         
-        if not GROQ_API_KEY:
+        if not self.settings.groq_api_key:
             raise ValueError("GROQ_API_KEY not set in environment")
         
         # Set default model if not specified
         if not self.model_name:
             self.model_name = "llama-3.3-70b-versatile"
         
-        return Groq(api_key=GROQ_API_KEY)
+        self._async_client_factory = partial(AsyncGroq, api_key=self.settings.groq_api_key)
+        return Groq(api_key=self.settings.groq_api_key)
     
     def _init_gemini(self):
         """Initialize Gemini client."""
@@ -73,41 +99,26 @@ class LLMClient:
         except ImportError:
             raise ImportError("Google Generative AI package not installed. Run: pip install google-generativeai")
         
-        if not GEMINI_API_KEY:
+        if not self.settings.gemini_api_key:
             raise ValueError("GEMINI_API_KEY not set in environment")
         
         # Set default model if not specified
         if not self.model_name:
             self.model_name = "gemini-2.5-flash"
         
-        genai.configure(api_key=GEMINI_API_KEY)
+        genai.configure(api_key=self.settings.gemini_api_key)
         return genai.GenerativeModel(self.model_name)
     
-    def _generate_openai(self, prompt: str) -> str:
-        """Generate using OpenAI API."""
-        try:
-            response = self._client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are a code analysis assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                timeout=30,
-            )
-            
-            content = response.choices[0].message.content
-            if not content or not content.strip():
-                raise ValueError("Empty response from OpenAI")
-            
-            return content.strip()
-            
-        except Exception as e:
-            raise Exception(f"OpenAI API error: {str(e)}")
+    def _stream_openai(self, prompt: str) -> Iterator[str]:
+        """Stream using OpenAI API."""
+        return self._stream_chat_completions(prompt, "OpenAI")
+    
+    def _stream_groq(self, prompt: str) -> Iterator[str]:
+        """Stream using Groq API."""
+        return self._stream_chat_completions(prompt, "Groq")
     
-    def _generate_groq(self, prompt: str) -> str:
-        """Generate using Groq API."""
+    def _stream_chat_completions(self, prompt: str, provider_name: str) -> Iterator[str]:
+        """Stream using an OpenAI-compatible chat completions client (OpenAI or Groq)."""
         try:
             response = self._client.chat.completions.create(
                 model=self.model_name,
@@ -118,19 +129,26 @@ class LLMClient:
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
                 timeout=30,
+                stream=True,
             )
             
-            content = response.choices[0].message.content
-            if not content or not content.strip():
-                raise ValueError("Empty response from Groq")
+            has_content = False
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    has_content = has_content or not content.isspace()
+                    yield content
             
-            return content.strip()
+            if not has_content:
+                raise ValueError(f"Empty response from {provider_name}")
             
         except Exception as e:
-            raise Exception(f"Groq API error: {str(e)}")
+            raise Exception(f"{provider_name} API error: {str(e)}")
     
-    def _generate_gemini(self, prompt: str) -> str:
-        """Generate using Gemini API."""
+    def _stream_gemini(self, prompt: str) -> Iterator[str]:
+        """Stream using Gemini API."""
         try:
             generation_config = {
                 "temperature": self.temperature,
@@ -140,20 +158,171 @@ class LLMClient:
             response = self._client.generate_content(
                 prompt,
                 generation_config=generation_config,
+                stream=True,
             )
             
-            if not response.text or not response.text.strip():
-                raise ValueError("Empty response from Gemini")
+            has_content = False
+            for chunk in response:
+                content = chunk.text
+                if content:
+                    has_content = has_content or not content.isspace()
+                    yield content
             
-            return response.text.strip()
+            if not has_content:
+                raise ValueError("Empty response from Gemini")
             
         except Exception as e:
             raise Exception(f"Gemini API error: {str(e)}")
     
+    def _get_async_client(self):
+        """Get the async SDK client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._async_clients[loop] = self._async_client_factory()
+            return client
+    
+    async def aclose(self):
+        """Close the async SDK client opened for the running event loop, if any."""
+        with self._async_clients_lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        
+        if client is not None:
+            await client.close()
+    
+    async def _agenerate_openai(self, prompt: str) -> str:
+        """Generate using the async OpenAI client."""
+        return await self._agenerate_chat(prompt, "OpenAI")
+    
+    async def _agenerate_groq(self, prompt: str) -> str:
+        """Generate using the async Groq client."""
+        return await self._agenerate_chat(prompt, "Groq")
+    
+    async def _agenerate_gemini(self, prompt: str) -> str:
+        """Generate using Gemini's sync client in a worker thread."""
+        return await asyncio.to_thread(_join_stream, self._stream_gemini(prompt))
+    
+    async def _agenerate_chat(self, prompt: str, provider_name: str) -> str:
+        """Generate using an async chat completions client (OpenAI or Groq)."""
+        try:
+            for attempt in range(ASYNC_MAX_RETRIES + 1):
+                try:
+                    response = await self._get_async_client().chat.completions.create(
+                        model=self.model_name,
+                        messages=[
+                            {"role": "system", "content": "You are a code analysis assistant."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        max_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                        timeout=30,
+                    )
+                    break
+                except Exception as e:
+                    if attempt == ASYNC_MAX_RETRIES or not _is_retryable(e):
+                        raise
+                    await asyncio.sleep(ASYNC_RETRY_BASE_DELAY * 2 ** attempt)
+            
+            content = response.choices[0].message.content
+            if not content or not content.strip():
+                raise ValueError(f"Empty response from {provider_name}")
+            
+            return content.strip()
+        
+        except Exception as e:
+            raise Exception(f"{provider_name} API error: {str(e)}")
+    
+    def _cache_key(self, prompt: str) -> str:
+        """Build the cache key for a prompt under the current provider settings."""
+        request = f"{self.provider}:{self.model_name}:{self.temperature}:{self.max_tokens}:{prompt}"
+        return hashlib.blake2b(request.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _read_disk_cache(self, key: str) -> Optional[str]:
+        """Read a persisted response, ignoring missing or corrupt files."""
+        if not self.cache_dir:
+            return None
+        
+        try:
+            with open(os.path.join(self.cache_dir, key + ".json"), "r", encoding="utf-8") as f:
+                return json.load(f)["response"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _write_disk_cache(self, key: str, response: str):
+        """Persist a response for later runs."""
+        if not self.cache_dir:
+            return
+        
+        cache_path = os.path.join(self.cache_dir, key + ".json")
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"response": response}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Caching is best-effort
+            pass
+    
     def generate(self, prompt: str) -> str:
         """
         Generate text using the configured LLM provider.
         
+        Args:
+            prompt: Input prompt for the LLM
+            
+        Returns:
+            Generated text response
+            
+        Raises:
+            Exception: If API call fails or returns empty response
+        """
+        return _join_stream(self.generate_stream(prompt))
+    
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Generate text, yielding chunks as the provider produces them.
+        
+        Cached responses are yielded as a single chunk. A response is cached
+        once the stream has been consumed completely.
+        
+        Args:
+            prompt: Input prompt for the LLM
+            
+        Yields:
+            Chunks of the generated text response
+            
+        Raises:
+            Exception: If API call fails or returns empty response
+        """
+        if not prompt or not prompt.strip():
+            raise ValueError("Prompt cannot be empty")
+        
+        # Identical requests are answered from memory, then from disk
+        key = self._cache_key(prompt)
+        result = self._cached_response(key)
+        if result is not None:
+            yield result
+            return
+        
+        parts = []
+        for chunk in self._stream_fn(prompt):
+            parts.append(chunk)
+            yield chunk
+        
+        result = _join_stream(parts)
+        self._remember(key, result)
+        self._write_disk_cache(key, result)
+    
+    async def agenerate(self, prompt: str) -> str:
+        """
+        Generate text without blocking the event loop.
+        
+        Shares the response cache with generate(). OpenAI and Groq use their
+        async SDK clients; Gemini runs the sync client in a worker thread.
+        
         Args:
             prompt: Input prompt for the LLM
             
@@ -166,12 +335,111 @@ class LLMClient:
         if not prompt or not prompt.strip():
             raise ValueError("Prompt cannot be empty")
         
-        # Route to the appropriate provider
-        if self.provider == "openai":
-            return self._generate_openai(prompt)
-        elif self.provider == "groq":
-            return self._generate_groq(prompt)
-        elif self.provider == "gemini":
-            return self._generate_gemini(prompt)
-        else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
\ No newline at end of file
+        key = self._cache_key(prompt)
+        result = self._cached_response(key)
+        if result is not None:
+            return result
+        
+        result = await self._agenerate_fn(prompt)
+        
+        self._remember(key, result)
+        self._write_disk_cache(key, result)
+        return result
+    
+    async def agenerate_many(
+        self,
+        prompts: List[str],
+        concurrency: int = 8
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate responses for several prompts with overlapping requests.
+        
+        Prompts are started longest first, by estimated token count, so the
+        slowest requests do not start last and stretch the whole batch.
+        
+        Args:
+            prompts: Input prompts for the LLM
+            concurrency: Maximum number of requests in flight
+            
+        Returns:
+            Responses in the same order as prompts; a prompt that fails gets
+            its exception in place of the response
+        """
+        results: List[Union[str, Exception]] = [None] * len(prompts)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(index: int):
+            async with semaphore:
+                try:
+                    results[index] = await self.agenerate(prompts[index])
+                except Exception as e:
+                    results[index] = e
+        
+        sizes = [count_tokens(prompt, self.model_name) for prompt in prompts]
+        order = sorted(range(len(prompts)), key=sizes.__getitem__, reverse=True)
+        await asyncio.gather(*(run(i) for i in order))
+        return results
+    
+    def _cached_response(self, key: str) -> Optional[str]:
+        """Look up a response in memory, then on disk."""
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        
+        result = self._read_disk_cache(key)
+        if result is not None:
+            self._remember(key, result)
+        return result
+    
+    def _remember(self, key: str, response: str):
+        """Add a response to the in-memory LRU cache."""
+        with self._cache_lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            if len(self._cache) > RESPONSE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+
+_shared_clients: Dict[str, LLMClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_llm_client(provider: Optional[str] = None) -> LLMClient:
+    """
+    Get the LLM client shared by all summarizers for a provider.
+    
+    Sharing one client keeps provider HTTP connections and the response
+    cache warm across summarizers. Each client is built from the settings
+    at first use; call reset_llm_client() after changing other settings.
+    
+    Args:
+        provider: LLM provider name, defaults to LLM_PROVIDER
+    
+    Returns:
+        Shared LLMClient instance
+    """
+    provider = (provider or get_settings().llm_provider).lower()
+    
+    with _shared_clients_lock:
+        client = _shared_clients.get(provider)
+        if client is None:
+            client = _shared_clients[provider] = LLMClient(provider)
+        return client
+
+
+def reset_llm_client():
+    """Drop the shared LLM clients so the next get_llm_client() builds new ones."""
+    with _shared_clients_lock:
+        _shared_clients.clear()
+
+
+def _join_stream(chunks) -> str:
+    """Join streamed chunks into the final response text."""
+    return "".join(chunks).strip()
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether an SDK error is a rate limit (429) or server error (5xx)."""
+    status = getattr(error, "status_code", None)
+    return status == 429 or (isinstance(status, int) and status >= 500)
\ No newline at end of file
@@ -2,17 +2,19 @@
 File-level summarizer for RepoAnalyzer.
 Generates summaries for individual code files using LLM.
 """
-from typing import Dict
-from llm.client import LLMClient
+from typing import Dict, List, Optional, Tuple
+import asyncio
+from llm.client import get_llm_client
 from llm.prompts import file_summary_prompt
+from llm.section_parser import extract_sections
 from analysis.language_detector import detect_language
 
 
 class FileSummarizer:
     """Generates summaries for individual files."""
     
-    def __init__(self):
-        self.client = LLMClient()
+    def __init__(self, provider: Optional[str] = None):
+        self.client = get_llm_client(provider)
     
     def summarize_file(self, file_path: str, content: str) -> Dict[str, str]:
         """
@@ -34,16 +36,9 @@ class FileSummarizer:
         # Detect language
         language = detect_language(file_path)
         
-        # Skip if content is too short or language unknown
-        if len(content.strip()) < 10 or language == "Unknown":
-            return {
-                "path": file_path,
-                "language": language,
-                "summary": "File skipped: insufficient content or unknown language",
-                "purpose": None,
-                "responsibilities": None,
-                "dependencies": None,
-            }
+        skipped = self._skipped_summary(file_path, language, content)
+        if skipped:
+            return skipped
         
         try:
             # Generate prompt
@@ -52,62 +47,92 @@ class FileSummarizer:
             # Get summary from LLM
             summary = self.client.generate(prompt)
             
-            # Parse structured information (basic extraction)
-            purpose = self._extract_section(summary, "Purpose")
-            responsibilities = self._extract_section(summary, "Responsibilities")
-            dependencies = self._extract_section(summary, "Key Dependencies")
-            
-            return {
-                "path": file_path,
-                "language": language,
-                "summary": summary,
-                "purpose": purpose,
-                "responsibilities": responsibilities,
-                "dependencies": dependencies,
-            }
+            return self._build_summary(file_path, language, summary)
+        
+        except Exception as e:
+            return self._error_summary(file_path, language, e)
+    
+    async def summarize_files(
+        self,
+        files: List[Tuple[str, str]],
+        concurrency: int = 8
+    ) -> List[Dict[str, str]]:
+        """
+        Summarize several files with overlapping LLM requests.
+        
+        Args:
+            files: List of (file_path, content) pairs
+            concurrency: Maximum number of requests in flight
             
+        Returns:
+            Summaries in the same order as files, shaped like summarize_file()
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def summarize(file_path: str, content: str) -> Dict[str, str]:
+            async with semaphore:
+                return await self._asummarize_file(file_path, content)
+        
+        return list(await asyncio.gather(
+            *(summarize(file_path, content) for file_path, content in files)
+        ))
+    
+    async def _asummarize_file(self, file_path: str, content: str) -> Dict[str, str]:
+        """Async counterpart of summarize_file()."""
+        language = detect_language(file_path)
+        
+        skipped = self._skipped_summary(file_path, language, content)
+        if skipped:
+            return skipped
+        
+        try:
+            prompt = file_summary_prompt(file_path, language, content)
+            summary = await self.client.agenerate(prompt)
+            return self._build_summary(file_path, language, summary)
+        
         except Exception as e:
+            return self._error_summary(file_path, language, e)
+    
+    def _skipped_summary(self, file_path: str, language: str, content: str) -> Optional[Dict[str, str]]:
+        """Get the placeholder summary for files not worth sending to the LLM."""
+        # Skip if content is too short or language unknown
+        if len(content.strip()) < 10 or language == "Unknown":
             return {
                 "path": file_path,
                 "language": language,
-                "summary": f"Error generating summary: {str(e)}",
+                "summary": "File skipped: insufficient content or unknown language",
                 "purpose": None,
                 "responsibilities": None,
                 "dependencies": None,
             }
+        return None
     
-    def _extract_section(self, text: str, section_name: str) -> str:
-        """
-        Extract a specific section from the summary.
+    def _build_summary(self, file_path: str, language: str, summary: str) -> Dict[str, str]:
+        """Parse structured information out of an LLM summary."""
+        # Parse structured information (basic extraction)
+        sections = extract_sections(summary, ("Purpose", "Responsibilities", "Key Dependencies"))
+        purpose = sections["Purpose"]
+        responsibilities = sections["Responsibilities"]
+        dependencies = sections["Key Dependencies"]
         
-        Args:
-            text: Full summary text
-            section_name: Name of section to extract
-            
-        Returns:
-            Extracted section text or None
-        """
-        lines = text.split("\n")
-        in_section = False
-        section_lines = []
-        
-        for line in lines:
-            # Check if this line starts the section
-            if section_name.lower() in line.lower() and (":" in line or "#" in line):
-                in_section = True
-                # If there's content after the colon on the same line, include it
-                if ":" in line:
-                    after_colon = line.split(":", 1)[1].strip()
-                    if after_colon:
-                        section_lines.append(after_colon)
-                continue
-            
-            # Check if we've reached a new section
-            if in_section and line.strip() and (line.strip().endswith(":") or line.startswith("#")):
-                break
-            
-            # Add line to section if we're in it
-            if in_section and line.strip():
-                section_lines.append(line.strip())
-        
-        return "\n".join(section_lines) if section_lines else None
\ No newline at end of file
+        return {
+            "path": file_path,
+            "language": language,
+            "summary": summary,
+            "purpose": purpose,
+            "responsibilities": responsibilities,
+            "dependencies": dependencies,
+            # Preformatted entry for folder prompts, reused by every folder that includes this file
+            "_prompt_snippet": f"File: {file_path}\n{summary}",
+        }
+    
+    def _error_summary(self, file_path: str, language: str, error: Exception) -> Dict[str, str]:
+        """Get the summary recorded when the LLM request fails."""
+        return {
+            "path": file_path,
+            "language": language,
+            "summary": f"Error generating summary: {str(error)}",
+            "purpose": None,
+            "responsibilities": None,
+            "dependencies": None,
+        }
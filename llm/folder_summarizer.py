@@ -2,16 +2,21 @@
 Folder-level summarizer for RepoAnalyzer.
 Generates summaries for folders/modules using file summaries.
 """
-from typing import Dict, List
-from llm.client import LLMClient
+from typing import Dict, List, Optional, Tuple
+from llm.client import get_llm_client
 from llm.prompts import folder_summary_prompt
+from llm.section_parser import extract_sections
+from llm.tokens import count_tokens
+
+# Maximum number of file summaries included in a folder prompt
+MAX_FILES_PER_FOLDER = 10
 
 
 class FolderSummarizer:
     """Generates summaries for folders/modules."""
     
-    def __init__(self):
-        self.client = LLMClient()
+    def __init__(self, provider: Optional[str] = None):
+        self.client = get_llm_client(provider)
     
     def summarize_folder(
         self,
@@ -36,89 +41,135 @@ class FolderSummarizer:
             - key_components: Main components
             - interactions: Interaction patterns
         """
-        # Filter out files with errors or skipped
-        valid_summaries = [
-            s for s in file_summaries
-            if s.get("summary") and not s["summary"].startswith("Error") and not s["summary"].startswith("File skipped")
-        ]
-        
-        # If no valid summaries, return basic info
-        if not valid_summaries:
-            return {
-                "folder": folder_path,
-                "role": folder_role,
-                "summary": f"Folder contains {len(file_summaries)} files but no detailed summaries available.",
-                "purpose": None,
-                "key_components": None,
-                "interactions": None,
-            }
-        
-        # Limit to top files to avoid token limits
-        summaries_to_use = valid_summaries[:10]
-        
         try:
-            # Generate prompt
-            prompt = folder_summary_prompt(folder_path, summaries_to_use)
+            prompt = self._folder_prompt(folder_path, file_summaries)
+            if prompt is None:
+                return self._empty_summary(folder_path, folder_role, file_summaries)
             
             # Get summary from LLM
             summary = self.client.generate(prompt)
             
-            # Parse structured information
-            purpose = self._extract_section(summary, "Module Purpose")
-            key_components = self._extract_section(summary, "Key Components")
-            interactions = self._extract_section(summary, "Interactions")
-            
-            return {
-                "folder": folder_path,
-                "role": folder_role,
-                "summary": summary,
-                "purpose": purpose,
-                "key_components": key_components,
-                "interactions": interactions,
-            }
+            return self._build_summary(folder_path, folder_role, summary)
             
         except Exception as e:
-            return {
-                "folder": folder_path,
-                "role": folder_role,
-                "summary": f"Error generating folder summary: {str(e)}",
-                "purpose": None,
-                "key_components": None,
-                "interactions": None,
-            }
+            return self._error_summary(folder_path, folder_role, e)
     
-    def _extract_section(self, text: str, section_name: str) -> str:
+    async def summarize_folders(
+        self,
+        folders: List[Tuple[str, str, List[Dict[str, str]]]],
+        concurrency: int = 8
+    ) -> List[Dict[str, str]]:
         """
-        Extract a specific section from the summary.
+        Summarize several folders with one batch of overlapping LLM requests.
         
         Args:
-            text: Full summary text
-            section_name: Name of section to extract
+            folders: List of (folder_path, folder_role, file_summaries) tuples
+            concurrency: Maximum number of requests in flight
             
         Returns:
-            Extracted section text or None
+            Summaries in the same order as folders, shaped like summarize_folder()
         """
-        lines = text.split("\n")
-        in_section = False
-        section_lines = []
+        prompts = [self._folder_prompt(folder_path, file_summaries) for folder_path, _, file_summaries in folders]
+        responses = iter(await self.client.agenerate_many(
+            [prompt for prompt in prompts if prompt is not None], concurrency
+        ))
         
-        for line in lines:
-            # Check if this line starts the section
-            if section_name.lower() in line.lower() and (":" in line or "#" in line):
-                in_section = True
-                # If there's content after the colon on the same line, include it
-                if ":" in line:
-                    after_colon = line.split(":", 1)[1].strip()
-                    if after_colon:
-                        section_lines.append(after_colon)
+        results = []
+        for (folder_path, folder_role, file_summaries), prompt in zip(folders, prompts):
+            if prompt is None:
+                results.append(self._empty_summary(folder_path, folder_role, file_summaries))
                 continue
             
-            # Check if we've reached a new section
-            if in_section and line.strip() and (line.strip().endswith(":") or line.startswith("#")):
-                break
+            response = next(responses)
+            if isinstance(response, Exception):
+                results.append(self._error_summary(folder_path, folder_role, response))
+            else:
+                results.append(self._build_summary(folder_path, folder_role, response))
+        
+        return results
+    
+    def _folder_prompt(self, folder_path: str, file_summaries: List[Dict[str, str]]) -> Optional[str]:
+        """Build the folder prompt, or None when no file has a usable summary."""
+        # Filter out files with errors or skipped
+        valid_summaries = [
+            s for s in file_summaries
+            if (text := s.get("summary")) and not text.startswith(("Error", "File skipped"))
+        ]
+        
+        if not valid_summaries:
+            return None
+        
+        # Limit to top files that fit the prompt token budget
+        summaries_to_use = self._pack_summaries(folder_path, valid_summaries)
+        
+        return folder_summary_prompt(folder_path, summaries_to_use)
+    
+    def _empty_summary(
+        self,
+        folder_path: str,
+        folder_role: str,
+        file_summaries: List[Dict[str, str]]
+    ) -> Dict[str, str]:
+        """Get the basic summary used when no file has a usable summary."""
+        return {
+            "folder": folder_path,
+            "role": folder_role,
+            "summary": f"Folder contains {len(file_summaries)} files but no detailed summaries available.",
+            "purpose": None,
+            "key_components": None,
+            "interactions": None,
+        }
+    
+    def _build_summary(self, folder_path: str, folder_role: str, summary: str) -> Dict[str, str]:
+        """Parse structured information out of a folder summary."""
+        # Parse structured information
+        sections = extract_sections(summary, ("Module Purpose", "Key Components", "Interactions"))
+        
+        return {
+            "folder": folder_path,
+            "role": folder_role,
+            "summary": summary,
+            "purpose": sections["Module Purpose"],
+            "key_components": sections["Key Components"],
+            "interactions": sections["Interactions"],
+        }
+    
+    def _error_summary(self, folder_path: str, folder_role: str, error: Exception) -> Dict[str, str]:
+        """Get the folder summary recorded when the LLM request fails."""
+        return {
+            "folder": folder_path,
+            "role": folder_role,
+            "summary": f"Error generating folder summary: {str(error)}",
+            "purpose": None,
+            "key_components": None,
+            "interactions": None,
+        }
+    
+    def _pack_summaries(self, folder_path: str, file_summaries: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Select leading file summaries until the prompt token budget is used up.
+        
+        The first summary is always kept so the folder prompt is never empty.
+        
+        Args:
+            folder_path: Path to the folder
+            file_summaries: Valid file summaries in priority order
             
-            # Add line to section if we're in it
-            if in_section and line.strip():
-                section_lines.append(line.strip())
+        Returns:
+            File summaries to include in the folder prompt
+        """
+        model_name = self.client.model_name
+        budget = self.client.settings.llm_max_input_tokens
+        used = count_tokens(folder_summary_prompt(folder_path, []), model_name)
+        
+        packed = []
+        for s in file_summaries[:MAX_FILES_PER_FOLDER]:
+            snippet = s.get("_prompt_snippet") or f"File: {s['path']}\n{s['summary']}"
+            # Account for the blank line joining summaries
+            tokens = count_tokens(snippet, model_name) + 1
+            if packed and used + tokens > budget:
+                break
+            packed.append(s)
+            used += tokens
         
-        return "\n".join(section_lines) if section_lines else None
\ No newline at end of file
+        return packed
@@ -2,25 +2,27 @@
 Centralized prompt templates for RepoAnalyzer.
 Provides deterministic prompts for code analysis tasks.
 """
+from itertools import islice
 from typing import Dict, List
 
 
-def file_summary_prompt(file_path: str, language: str, content: str) -> str:
-    """
-    Generate prompt for file-level code summary.
-    
-    Args:
-        file_path: Path to the file
-        language: Programming language
-        content: File content
-        
-    Returns:
-        Formatted prompt string
-    """
-    prompt = f"""
-        Analyze the following {language} file.
+# Maximum number of folders described in the architecture prompt
+MAX_PROMPT_FOLDERS = 30
 
-        File: {file_path}
+# Folder roles in the order they are kept when there are too many folders
+ROLE_PRIORITY = {
+    role: rank
+    for rank, role in enumerate([
+        "backend", "database", "frontend", "infrastructure", "config", "scripts", "misc", "tests", "docs",
+    ])
+}
+
+# Prompt templates, filled with str.format_map. Each starts with its fixed
+# instructions and output format and ends with the request data, so calls of
+# the same kind share a byte-identical prefix that providers can cache.
+
+# File-level summary prompt
+FILE_SUMMARY_TEMPLATE = """Analyze the source file given at the end.
 
         Rules:
         - No introduction or conclusion
@@ -39,33 +41,14 @@ def file_summary_prompt(file_path: str, language: str, content: str) -> str:
         Key Dependencies:
         - <max 3 bullets>
 
-        Code:
-        {content}
-        """.strip()
-    
-    return prompt
-
+        Language: {language}
+        File: {file_path}
 
-def folder_summary_prompt(folder_path: str, file_summaries: List[Dict[str, str]]) -> str:
-    """
-    Generate prompt for folder/module-level summary.
-    
-    Args:
-        folder_path: Path to the folder
-        file_summaries: List of file summaries in the folder
-        
-    Returns:
-        Formatted prompt string
-    """
-    summaries_text = "\n\n".join([
-        f"File: {s['path']}\n{s['summary']}"
-        for s in file_summaries
-    ])
-    
-    prompt = f"""
-        Summarize the module below.
+        Code:
+        {content}"""
 
-        Folder: {folder_path}
+# Folder/module-level summary prompt
+FOLDER_SUMMARY_TEMPLATE = """Summarize the module given at the end.
 
         Rules:
         - No filler text
@@ -84,11 +67,116 @@ def folder_summary_prompt(folder_path: str, file_summaries: List[Dict[str, str]]
         Interactions:
         - <max 2 bullets>
 
+        Folder: {folder_path}
+
         File Summaries:
-        {summaries_text}
-        """.strip()
+        {summaries_text}"""
+
+# Repository architecture prompt
+REPO_ARCHITECTURE_TEMPLATE = """Analyze the architecture of the repository given at the end.
+
+        Rules:
+        - No introduction or summary paragraph
+        - Bullet points only
+        - Each bullet ≤ 16 words
+
+        Output format EXACTLY:
+
+        Project Purpose:
+        - <max 2 bullets>
+
+        Architecture:
+        - <max 3 bullets>
+
+        Key Modules:
+        - <max 6 bullets>
+
+        Technology Choices:
+        - <max 3 bullets>
+
+        Repository: {repo_name}
+        Description: {description}
+
+        Languages: {lang_text}
+        Frameworks: {frameworks}
+        Databases: {databases}
+        Infrastructure: {infrastructure}
+        Entry Points: {entry_points}
+
+        Module Details:
+        {folders_text}"""
+
+# Execution flow prompt
+EXECUTION_FLOW_TEMPLATE = """Describe the execution flow of the repository given at the end.
+
+        Rules:
+        - No paragraphs
+        - Numbered steps only
+        - Max 6 steps
+        - Each step ≤ 16 words
+
+        Output format EXACTLY:
+
+        Entry Point:
+        - <1 bullet>
+
+        Request Flow:
+        1. <step>
+        2. <step>
+        3. <step>
+
+        Key Interactions:
+        - <max 4 bullets>
+
+        Repository: {repo_name}
+        Frameworks: {frameworks}
+
+        Entry Files:
+        {app_entries}
+
+        Relevant Modules:
+        {backend_folders}"""
+
+
+def file_summary_prompt(file_path: str, language: str, content: str) -> str:
+    """
+    Generate prompt for file-level code summary.
     
-    return prompt
+    Args:
+        file_path: Path to the file
+        language: Programming language
+        content: File content
+        
+    Returns:
+        Formatted prompt string
+    """
+    return FILE_SUMMARY_TEMPLATE.format_map({
+        "language": language,
+        "file_path": file_path,
+        "content": content,
+    }).rstrip()
+
+
+def folder_summary_prompt(folder_path: str, file_summaries: List[Dict[str, str]]) -> str:
+    """
+    Generate prompt for folder/module-level summary.
+    
+    Args:
+        folder_path: Path to the folder
+        file_summaries: List of file summaries in the folder
+        
+    Returns:
+        Formatted prompt string
+    """
+    summaries_text = "\n\n".join([
+        s.get("_prompt_snippet") or f"File: {s['path']}\n{s['summary']}"
+        for s in file_summaries
+    ])
+    
+    return FOLDER_SUMMARY_TEMPLATE.format_map({
+        "folder_path": folder_path,
+        "summaries_text": summaries_text,
+    }).rstrip()
 
 
 def repo_architecture_prompt(
@@ -118,60 +206,70 @@ def repo_architecture_prompt(
         Formatted prompt string
     """
     # Format languages
-    lang_text = ", ".join([f"{lang} ({info['percentage']}%)" 
-                           for lang, info in list(languages.items())[:5]])
+    lang_text = ", ".join(f"{lang} ({info['percentage']}%)"
+                          for lang, info in islice(languages.items(), 5))
     
     # Format tech stack
-    frameworks_text = ", ".join(frameworks) if frameworks else "None detected"
-    databases_text = ", ".join(databases) if databases else "None detected"
-    infra_text = ", ".join(infrastructure) if infrastructure else "None detected"
+    frameworks_text = ", ".join(frameworks) if frameworks else "None"
+    databases_text = ", ".join(databases) if databases else "None"
+    infra_text = ", ".join(infrastructure) if infrastructure else "None"
     
-    # Format folder summaries
+    # Format folder summaries, keeping the most informative ones for large repos
     folders_text = "\n\n".join([
         f"Folder: {s['folder']}\nRole: {s['role']}\n{s['summary']}"
-        for s in folder_summaries
+        for s in _prioritize_folders(folder_summaries)
     ])
     
     # Format entrypoints
     entry_files = [e['path'] for e in entrypoints.get('application_files', [])]
-    entry_text = ", ".join(entry_files[:5]) if entry_files else "None detected"
+    entry_text = ", ".join(entry_files) if entry_files else "None"
     
-    prompt = f"""
-        Analyze the repository architecture.
-
-        Repository: {repo_name}
-        Description: {description}
-
-        Languages: {lang_text}
-        Frameworks: {", ".join(frameworks) if frameworks else "None"}
-        Databases: {", ".join(databases) if databases else "None"}
-        Infrastructure: {", ".join(infrastructure) if infrastructure else "None"}
-        Entry Points: {", ".join(entry_files) if entry_files else "None"}
-
-        Rules:
-        - No introduction or summary paragraph
-        - Bullet points only
-        - Each bullet ≤ 16 words
-
-        Output format EXACTLY:
-
-        Project Purpose:
-        - <max 2 bullets>
-
-        Architecture:
-        - <max 3 bullets>
-
-        Key Modules:
-        - <max 6 bullets>
-
-        Technology Choices:
-        - <max 3 bullets>
-
-        Module Details:
-        {folders_text}
-        """.strip()
-            
-    return prompt
+    return REPO_ARCHITECTURE_TEMPLATE.format_map({
+        "repo_name": repo_name,
+        "description": description,
+        "lang_text": lang_text,
+        "frameworks": frameworks_text,
+        "databases": databases_text,
+        "infrastructure": infra_text,
+        "entry_points": entry_text,
+        "folders_text": folders_text,
+    }).rstrip()
+
+
+def _prioritize_folders(
+    folder_summaries: List[Dict[str, str]],
+    limit: int = MAX_PROMPT_FOLDERS
+) -> List[Dict[str, str]]:
+    """
+    Drop repeated folder summaries and limit the rest to the highest-value roles.
+    
+    Summaries are repeats when their text matches after case and whitespace
+    are normalized, e.g. identical placeholder or error summaries.
+    
+    Args:
+        folder_summaries: Summaries of all folders
+        limit: Maximum number of folders to keep
+        
+    Returns:
+        Distinct folder summaries in their original order if within the limit,
+        otherwise the first `limit` ordered by role priority (stable within a role)
+    """
+    seen = set()
+    distinct = []
+    for s in folder_summaries:
+        key = " ".join(s["summary"].lower().split())
+        if key not in seen:
+            seen.add(key)
+            distinct.append(s)
+    
+    if len(distinct) <= limit:
+        return distinct
+    
+    unranked = len(ROLE_PRIORITY)
+    return sorted(
+        distinct,
+        key=lambda s: ROLE_PRIORITY.get(s.get("role"), unranked)
+    )[:limit]
 
 
 def execution_flow_prompt(
@@ -203,36 +301,9 @@ def execution_flow_prompt(
         for s in folder_summaries if s["role"] in ["backend", "api"]
     )
 
-    return f"""
-        Describe the execution flow.
-
-        Repository: {repo_name}
-        Frameworks: {", ".join(frameworks) if frameworks else "None"}
-
-        Rules:
-        - No paragraphs
-        - Numbered steps only
-        - Max 6 steps
-        - Each step ≤ 16 words
-
-        Output format EXACTLY:
-
-        Entry Point:
-        - <1 bullet>
-
-        Request Flow:
-        1. <step>
-        2. <step>
-        3. <step>
-
-        Key Interactions:
-        - <max 4 bullets>
-
-        Entry Files:
-        {app_entries}
-
-        Relevant Modules:
-        {backend_folders}
-        """.strip()
-    
-    return prompt
+    return EXECUTION_FLOW_TEMPLATE.format_map({
+        "repo_name": repo_name,
+        "frameworks": ", ".join(frameworks) if frameworks else "None",
+        "app_entries": app_entries,
+        "backend_folders": backend_folders,
+    }).rstrip()
@@ -2,16 +2,21 @@
 Repository-level summarizer for RepoAnalyzer.
 Generates comprehensive repository overview combining all analysis results.
 """
-from typing import Dict, List
-from llm.client import LLMClient
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+from llm.client import get_llm_client
 from llm.prompts import repo_architecture_prompt, execution_flow_prompt
+from llm.section_parser import SectionStream, extract_sections
+
+# Sections parsed out of the architecture summary, in the order the prompt asks for them
+ARCHITECTURE_SECTIONS = ("Project Purpose", "Architecture", "Key Modules", "Technology Choices")
 
 
 class RepoSummarizer:
     """Generates comprehensive repository-level summaries."""
     
-    def __init__(self):
-        self.client = LLMClient()
+    def __init__(self, provider: Optional[str] = None):
+        self.client = get_llm_client(provider)
     
     def summarize_architecture(
         self,
@@ -22,7 +27,8 @@ class RepoSummarizer:
         databases: List[str],
         infrastructure: List[str],
         folder_summaries: List[Dict[str, str]],
-        entrypoints: Dict[str, List[Dict[str, str]]]
+        entrypoints: Dict[str, List[Dict[str, str]]],
+        on_section: Optional[Callable[[str, str], None]] = None
     ) -> Dict[str, str]:
         """
         Generate comprehensive architecture summary for the repository.
@@ -36,6 +42,8 @@ class RepoSummarizer:
             infrastructure: Detected infrastructure tools
             folder_summaries: List of folder summaries
             entrypoints: Detected entry points
+            on_section: Optional callback called with (section name, text) as
+                each section of the streamed response completes
             
         Returns:
             Dictionary with architecture summary containing:
@@ -59,33 +67,16 @@ class RepoSummarizer:
                 entrypoints=entrypoints
             )
             
-            # Get summary from LLM
-            summary = self.client.generate(prompt)
+            # Get summary from LLM, streaming it when sections are wanted early
+            if on_section is None:
+                summary = self.client.generate(prompt)
+            else:
+                summary = self._generate_with_sections(prompt, ARCHITECTURE_SECTIONS, on_section)
             
-            # Parse structured information
-            purpose = self._extract_section(summary, "Project Purpose")
-            architecture = self._extract_section(summary, "Architecture")
-            key_modules = self._extract_section(summary, "Key Modules")
-            tech_choices = self._extract_section(summary, "Technology Choices")
-            
-            return {
-                "repo_name": repo_name,
-                "summary": summary,
-                "purpose": purpose,
-                "architecture": architecture,
-                "key_modules": key_modules,
-                "tech_choices": tech_choices,
-            }
+            return self._parse_architecture(repo_name, summary)
             
         except Exception as e:
-            return {
-                "repo_name": repo_name,
-                "summary": f"Error generating architecture summary: {str(e)}",
-                "purpose": None,
-                "architecture": None,
-                "key_modules": None,
-                "tech_choices": None,
-            }
+            return self._architecture_error(repo_name, e)
     
     def summarize_execution_flow(
         self,
@@ -123,60 +114,234 @@ class RepoSummarizer:
             # Get summary from LLM
             summary = self.client.generate(prompt)
             
-            # Parse structured information
-            entry_point = self._extract_section(summary, "Entry Point")
-            request_flow = self._extract_section(summary, "Request Flow")
-            key_interactions = self._extract_section(summary, "Key Interactions")
+            return self._parse_execution_flow(repo_name, summary)
+            
+        except Exception as e:
+            return self._execution_flow_error(repo_name, e)
+    
+    async def asummarize_architecture(
+        self,
+        repo_name: str,
+        description: str,
+        languages: Dict[str, any],
+        frameworks: List[str],
+        databases: List[str],
+        infrastructure: List[str],
+        folder_summaries: List[Dict[str, str]],
+        entrypoints: Dict[str, List[Dict[str, str]]],
+        on_section: Optional[Callable[[str, str], None]] = None
+    ) -> Dict[str, str]:
+        """
+        Async variant of summarize_architecture().
+        
+        Args:
+            repo_name: Repository name
+            description: Repository description
+            languages: Language statistics from analysis
+            frameworks: Detected frameworks
+            databases: Detected databases
+            infrastructure: Detected infrastructure tools
+            folder_summaries: List of folder summaries
+            entrypoints: Detected entry points
+            on_section: Optional callback called on the event loop's thread with
+                (section name, text) as each section of the streamed response completes
+            
+        Returns:
+            Dictionary shaped like the result of summarize_architecture()
+        """
+        try:
+            prompt = repo_architecture_prompt(
+                repo_name=repo_name,
+                description=description,
+                languages=languages,
+                frameworks=frameworks,
+                databases=databases,
+                infrastructure=infrastructure,
+                folder_summaries=folder_summaries,
+                entrypoints=entrypoints
+            )
+            
+            if on_section is None:
+                summary = await self.client.agenerate(prompt)
+            else:
+                # Stream in a worker thread, handing each section back to the loop's thread
+                loop = asyncio.get_running_loop()
+                summary = await asyncio.to_thread(
+                    self._generate_with_sections,
+                    prompt,
+                    ARCHITECTURE_SECTIONS,
+                    lambda name, text: loop.call_soon_threadsafe(on_section, name, text),
+                )
+            
+            return self._parse_architecture(repo_name, summary)
+            
+        except Exception as e:
+            return self._architecture_error(repo_name, e)
+    
+    async def asummarize_execution_flow(
+        self,
+        repo_name: str,
+        entrypoints: Dict[str, List[Dict[str, str]]],
+        frameworks: List[str],
+        folder_summaries: List[Dict[str, str]]
+    ) -> Dict[str, str]:
+        """
+        Async variant of summarize_execution_flow().
+        
+        Args:
+            repo_name: Repository name
+            entrypoints: Detected entry points
+            frameworks: Detected frameworks
+            folder_summaries: List of folder summaries
+            
+        Returns:
+            Dictionary shaped like the result of summarize_execution_flow()
+        """
+        try:
+            prompt = execution_flow_prompt(
+                repo_name=repo_name,
+                entrypoints=entrypoints,
+                frameworks=frameworks,
+                folder_summaries=folder_summaries
+            )
+            
+            summary = await self.client.agenerate(prompt)
             
-            return {
-                "repo_name": repo_name,
-                "summary": summary,
-                "entry_point": entry_point,
-                "request_flow": request_flow,
-                "key_interactions": key_interactions,
-            }
+            return self._parse_execution_flow(repo_name, summary)
             
         except Exception as e:
-            return {
-                "repo_name": repo_name,
-                "summary": f"Error generating execution flow summary: {str(e)}",
-                "entry_point": None,
-                "request_flow": None,
-                "key_interactions": None,
-            }
+            return self._execution_flow_error(repo_name, e)
+    
+    async def summarize_all(
+        self,
+        repo_name: str,
+        description: str,
+        languages: Dict[str, any],
+        frameworks: List[str],
+        databases: List[str],
+        infrastructure: List[str],
+        folder_summaries: List[Dict[str, str]],
+        entrypoints: Dict[str, List[Dict[str, str]]],
+        on_section: Optional[Callable[[str, str], None]] = None
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Generate the architecture and execution flow summaries concurrently.
+        
+        Args:
+            repo_name: Repository name
+            description: Repository description
+            languages: Language statistics from analysis
+            frameworks: Detected frameworks
+            databases: Detected databases
+            infrastructure: Detected infrastructure tools
+            folder_summaries: List of folder summaries
+            entrypoints: Detected entry points
+            on_section: Optional callback for architecture sections, as in
+                asummarize_architecture()
+            
+        Returns:
+            Tuple of (architecture summary, execution flow summary), shaped like
+            the results of summarize_architecture() and summarize_execution_flow()
+        """
+        architecture_summary, execution_flow_summary = await asyncio.gather(
+            self.asummarize_architecture(
+                repo_name, description, languages, frameworks, databases,
+                infrastructure, folder_summaries, entrypoints, on_section
+            ),
+            self.asummarize_execution_flow(repo_name, entrypoints, frameworks, folder_summaries),
+        )
+        return architecture_summary, execution_flow_summary
     
-    def _extract_section(self, text: str, section_name: str) -> str:
+    def _generate_with_sections(
+        self,
+        prompt: str,
+        section_names: Tuple[str, ...],
+        on_section: Callable[[str, str], None]
+    ) -> str:
         """
-        Extract a specific section from the summary.
+        Stream a response, reporting each named section as soon as it completes.
         
         Args:
-            text: Full summary text
-            section_name: Name of section to extract
+            prompt: Prompt to send
+            section_names: Sections to report
+            on_section: Callback called with (section name, text) once per section
             
         Returns:
-            Extracted section text or None
+            Full response text, as returned by LLMClient.generate()
         """
-        lines = text.split("\n")
-        in_section = False
-        section_lines = []
+        stream = SectionStream(section_names)
+        reported = set()
+        
+        def report(names):
+            for name in names:
+                text = stream.section(name)
+                if text and name not in reported:
+                    reported.add(name)
+                    on_section(name, text)
+        
+        parts = []
+        pending = ""
+        started = False
+        for chunk in self.client.generate_stream(prompt):
+            parts.append(chunk)
+            pending += chunk
+            # Leading whitespace is stripped from the final response as well
+            if not started:
+                pending = pending.lstrip()
+                started = bool(pending)
+            *lines, pending = pending.split("\n")
+            report(stream.feed_lines(lines))
         
-        for line in lines:
-            # Check if this line starts the section
-            if section_name.lower() in line.lower() and (":" in line or "#" in line):
-                in_section = True
-                # If there's content after the colon on the same line, include it
-                if ":" in line:
-                    after_colon = line.split(":", 1)[1].strip()
-                    if after_colon:
-                        section_lines.append(after_colon)
-                continue
-            
-            # Check if we've reached a new section
-            if in_section and line.strip() and (line.strip().endswith(":") or line.startswith("#")):
-                break
-            
-            # Add line to section if we're in it
-            if in_section and line.strip():
-                section_lines.append(line.strip())
+        # Sections still open at the end of the response are complete now
+        stream.feed_lines([pending])
+        report(section_names)
         
-        return "\n".join(section_lines) if section_lines else None
+        return "".join(parts).strip()
+    
+    def _parse_architecture(self, repo_name: str, summary: str) -> Dict[str, str]:
+        """Parse structured information out of an architecture summary."""
+        # Parse structured information
+        sections = extract_sections(summary, ARCHITECTURE_SECTIONS)
+        
+        return {
+            "repo_name": repo_name,
+            "summary": summary,
+            "purpose": sections["Project Purpose"],
+            "architecture": sections["Architecture"],
+            "key_modules": sections["Key Modules"],
+            "tech_choices": sections["Technology Choices"],
+        }
+    
+    def _architecture_error(self, repo_name: str, error: Exception) -> Dict[str, str]:
+        """Get the architecture summary recorded when the LLM request fails."""
+        return {
+            "repo_name": repo_name,
+            "summary": f"Error generating architecture summary: {str(error)}",
+            "purpose": None,
+            "architecture": None,
+            "key_modules": None,
+            "tech_choices": None,
+        }
+    
+    def _parse_execution_flow(self, repo_name: str, summary: str) -> Dict[str, str]:
+        """Parse structured information out of an execution flow summary."""
+        # Parse structured information
+        sections = extract_sections(summary, ("Entry Point", "Request Flow", "Key Interactions"))
+        
+        return {
+            "repo_name": repo_name,
+            "summary": summary,
+            "entry_point": sections["Entry Point"],
+            "request_flow": sections["Request Flow"],
+            "key_interactions": sections["Key Interactions"],
+        }
+    
+    def _execution_flow_error(self, repo_name: str, error: Exception) -> Dict[str, str]:
+        """Get the execution flow summary recorded when the LLM request fails."""
+        return {
+            "repo_name": repo_name,
+            "summary": f"Error generating execution flow summary: {str(error)}",
+            "entry_point": None,
+            "request_flow": None,
+            "key_interactions": None,
+        }
@@ -0,0 +1,129 @@
+"""
+Section parsing for RepoAnalyzer.
+Extracts named sections ("Purpose:", "## Key Components", ...) from LLM summaries.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+import re
+
+# Matches list item markers ("-", "*", "•", "1.", "2)") at the start of a stripped line
+_LIST_ITEM_RE = re.compile(r"(?:[-*•]|\d+[.)])")
+
+
+def _section_line_content(line: str) -> str:
+    """Get the text a section line contributes: after the colon for headers, else the whole line."""
+    if ":" in line:
+        return line.split(":", 1)[1].strip()
+    return ""
+
+
+def extract_section(text: str, section_name: str) -> Optional[str]:
+    """
+    Extract a specific section from the summary.
+    
+    Args:
+        text: Full summary text
+        section_name: Name of section to extract
+    
+    Returns:
+        Extracted section text or None
+    """
+    return extract_sections(text, (section_name,))[section_name]
+
+
+class SectionStream:
+    """
+    Incrementally extracts sections from text fed line by line.
+    
+    A section starts at a line that mentions its name and contains a ":" or
+    "#", and contributes the text after that line's colon. It runs until the
+    next line that starts with "#" or ends with ":", unless that line mentions
+    the section name again or is a list item (such as "- Handles requests via:").
+    
+    Each section is reported as soon as a later line ends it, so callers can
+    use sections of a streamed response before the rest arrives.
+    """
+    
+    def __init__(self, section_names: Sequence[str]):
+        self.section_names = tuple(section_names)
+        self._names_lower = [name.lower() for name in self.section_names]
+        self._collected: List[List[str]] = [[] for _ in self.section_names]
+        # Per section: 0 = header not seen yet, 1 = inside section, 2 = finished
+        self._states = [0] * len(self.section_names)
+        self.open_count = len(self.section_names)
+    
+    def feed_lines(self, lines: Iterable[str]) -> List[str]:
+        """
+        Process the next lines of text.
+        
+        Args:
+            lines: Lines without their trailing newlines
+            
+        Returns:
+            Names of the sections that these lines finished, in order
+        """
+        names_lower = self._names_lower
+        collected = self._collected
+        states = self._states
+        finished = []
+        
+        for line in lines:
+            if not self.open_count:
+                break
+            
+            stripped = line.strip()
+            line_lower = line.lower()
+            is_header_like = ":" in line or "#" in line
+            ends_section = bool(stripped) and (
+                line.startswith("#") or (stripped.endswith(":") and not _LIST_ITEM_RE.match(stripped))
+            )
+            
+            for i, name_lower in enumerate(names_lower):
+                state = states[i]
+                if state == 2:
+                    continue
+                
+                # Header lines (re)start the section and contribute what follows their colon
+                if is_header_like and name_lower in line_lower:
+                    states[i] = 1
+                    after_colon = _section_line_content(line)
+                    if after_colon:
+                        collected[i].append(after_colon)
+                elif state == 1:
+                    if ends_section:
+                        states[i] = 2
+                        self.open_count -= 1
+                        finished.append(self.section_names[i])
+                    elif stripped:
+                        collected[i].append(stripped)
+        
+        return finished
+    
+    def section(self, section_name: str) -> Optional[str]:
+        """Get the text collected so far for a section, or None."""
+        lines = self._collected[self.section_names.index(section_name)]
+        return "\n".join(lines) if lines else None
+    
+    def sections(self) -> Dict[str, Optional[str]]:
+        """Get the text collected so far for every section."""
+        return {
+            name: "\n".join(lines) if lines else None
+            for name, lines in zip(self.section_names, self._collected)
+        }
+
+
+def extract_sections(text: str, section_names: Sequence[str]) -> Dict[str, Optional[str]]:
+    """
+    Extract several sections from the summary in a single pass over its lines.
+    
+    Each section follows the rules described on SectionStream.
+    
+    Args:
+        text: Full summary text
+        section_names: Names of sections to extract
+    
+    Returns:
+        Dictionary mapping each section name to its text or None
+    """
+    stream = SectionStream(section_names)
+    stream.feed_lines(text.split("\n"))
+    return stream.sections()
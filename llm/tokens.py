@@ -0,0 +1,52 @@
+"""
+Token counting for RepoAnalyzer prompts.
+Uses tiktoken when it is installed and falls back to a character estimate.
+"""
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough characters per token for English text and code
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model_name: str):
+    """Load the tokenizer for a model once, or None when unavailable."""
+    if tiktoken is None:
+        return None
+    
+    # Encodings are downloaded on first use and may be unreachable; any failure
+    # falls back to the character estimate, and the None result is cached
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        # Unknown model, use the common encoding below
+        pass
+    except Exception:
+        return None
+    
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model_name: str = "") -> int:
+    """
+    Count (or estimate) the tokens in a text.
+    
+    Args:
+        text: Text to measure
+        model_name: Model whose tokenizer to use, if known to tiktoken
+        
+    Returns:
+        Number of tokens
+    """
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
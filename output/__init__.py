@@ -1,10 +1,12 @@
 """Output and reporting layer for RepoAnalyzer."""
 
 from output.report_builder import build_report
-from output.formatter import format_markdown, format_json
+from output.formatter import format_markdown, format_markdown_to_stream, format_json, format_json_to_stream
 
 __all__ = [
     "build_report",
     "format_markdown",
+    "format_markdown_to_stream",
     "format_json",
+    "format_json_to_stream",
 ]
\ No newline at end of file
@@ -2,9 +2,26 @@
 Output formatter for RepoAnalyzer.
 Converts structured report data into user-facing formats (Markdown, JSON).
 """
-from typing import Dict, List, Any
+from typing import Callable, Dict, Iterator, List, Any, TextIO, Tuple
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Emoji shown next to each folder role in the structure table
+ROLE_EMOJI = {
+    "backend": "⚙️",
+    "frontend": "🎨",
+    "api": "🔌",
+    "database": "💾",
+    "config": "⚙️",
+    "tests": "🧪",
+    "docs": "📚",
+    "misc": "📦",
+}
+
 
 def format_markdown(report: Dict[str, Any]) -> str:
     """
@@ -16,40 +33,71 @@ def format_markdown(report: Dict[str, Any]) -> str:
     Returns:
         Markdown-formatted string
     """
-    sections = []
-    
-    # Header
-    sections.append(_format_header(report))
-    
-    # Overview
-    sections.append(_format_overview(report))
-    
-    # Tech Stack
-    sections.append(_format_tech_stack(report))
+    # Sections are written line by line into one list and joined once;
+    # a blank line separates consecutive sections
+    out: List[str] = []
     
-    # Architecture
-    sections.append(_format_architecture(report))
+    for format_section in _sections_with_content(report):
+        if out:
+            out.append("")
+        format_section(report, out)
     
-    # Folder Structure
-    sections.append(_format_folder_structure(report))
-    
-    # Entry Points
-    sections.append(_format_entry_points(report))
-    
-    # Execution Flow
-    sections.append(_format_execution_flow(report))
-    
-    # Module Summaries
-    sections.append(_format_module_summaries(report))
-    
-    # Diagrams
-    sections.append(_format_diagrams(report))
+    return "\n".join(out)
+
+
+def format_markdown_to_stream(report: Dict[str, Any], fp: TextIO):
+    """
+    Write report as Markdown to a text stream one section at a time.
     
-    # Dependencies (optional, can be verbose)
-    if report.get("dependencies", {}).get("total_nodes", 0) > 0:
-        sections.append(_format_dependencies(report))
+    Produces the same text as format_markdown() while only holding one
+    section's lines in memory.
     
-    return "\n\n".join(sections)
+    Args:
+        report: Structured report dictionary from report_builder
+        fp: Writable text stream, e.g. a file opened with encoding="utf-8"
+    """
+    write = fp.write
+    
+    for index, format_section in enumerate(_sections_with_content(report)):
+        if index:
+            write("\n\n")
+        lines: List[str] = []
+        format_section(report, lines)
+        write("\n".join(lines))
+
+
+def _sections_with_content(report: Dict[str, Any]) -> Iterator[Callable]:
+    """Yield the markdown section writers, in order, for sections the report has content for."""
+    # (section writer, report fields it renders); a section is written only
+    # when one of its fields has content, instead of rendering a bare heading
+    sections = (
+        (_format_header, ()),
+        (_format_overview, (("overview", "purpose"), ("overview", "architecture"),
+                            ("key_insights", "architecture_pattern"))),
+        (_format_tech_stack, (("tech_stack", "languages"), ("tech_stack", "frameworks"),
+                              ("tech_stack", "databases"), ("tech_stack", "infrastructure"))),
+        (_format_architecture, (("key_insights", "key_modules"), ("key_insights", "tech_choices"))),
+        (_format_folder_structure, (("structure", "folders"),)),
+        (_format_entry_points, (("entry_points", "application_files"),
+                                ("entry_points", "framework_entrypoints"),
+                                ("entry_points", "docker_entrypoints"))),
+        (_format_execution_flow, (("execution_flow", "entry_point"), ("execution_flow", "request_flow"),
+                                  ("execution_flow", "key_interactions"))),
+        (_format_module_summaries, (("structure", "folder_summaries"),)),
+        (_format_diagrams, (("diagrams", "flow_diagram"), ("diagrams", "module_diagram"),
+                            ("diagrams", "dependency_diagram"))),
+        # Dependencies (optional, can be verbose)
+        (_format_dependencies, (("dependencies", "total_nodes"),)),
+    )
+    
+    for format_section, fields in sections:
+        if not fields or _has_content(report, fields):
+            yield format_section
+
+
+def _has_content(report: Dict[str, Any], fields: Tuple[Tuple[str, str], ...]) -> bool:
+    """Check whether any of the given (section, key) report fields is non-empty."""
+    return any((report.get(section) or {}).get(key) for section, key in fields)
 
 
 def format_json(report: Dict[str, Any]) -> str:
@@ -62,311 +110,300 @@ def format_json(report: Dict[str, Any]) -> str:
     Returns:
         JSON-formatted string
     """
+    if orjson is not None:
+        try:
+            return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            # Values orjson cannot serialize go through the standard library
+            pass
     return json.dumps(report, indent=2, ensure_ascii=False)
 
 
-def _format_header(report: Dict[str, Any]) -> str:
+def format_json_to_stream(report: Dict[str, Any], fp: TextIO):
+    """
+    Write report as JSON to a text stream without building the whole string.
+    
+    Args:
+        report: Structured report dictionary from report_builder
+        fp: Writable text stream, e.g. a file opened with encoding="utf-8"
+    """
+    json.dump(report, fp, indent=2, ensure_ascii=False)
+
+
+def _format_header(report: Dict[str, Any], out: List[str]):
     """Format markdown header section."""
     metadata = report.get("metadata", {})
     tech_stack = report.get("tech_stack", {})
     
-    lines = [
+    out.extend([
         f"# {metadata.get('repo_name', 'Repository')} Analysis Report",
         "",
         f"**Owner:** {metadata.get('owner', 'Unknown')}  ",
         f"**Repository:** {metadata.get('repo_name', 'Unknown')}  ",
         f"**Branch:** {metadata.get('branch', 'main')}  ",
         f"**Primary Language:** {tech_stack.get('primary_language', 'Unknown')}  ",
-    ]
+    ])
     
     if metadata.get("stars", 0) > 0:
-        lines.append(f"**Stars:** ⭐ {metadata.get('stars')}  ")
+        out.append(f"**Stars:** ⭐ {metadata.get('stars')}  ")
     
     if metadata.get("description"):
-        lines.extend(["", f"**Description:** {metadata.get('description')}"])
-    
-    return "\n".join(lines)
+        out.extend(["", f"**Description:** {metadata.get('description')}"])
 
 
-def _format_overview(report: Dict[str, Any]) -> str:
+def _format_overview(report: Dict[str, Any], out: List[str]):
     """Format overview section."""
     overview = report.get("overview", {})
     insights = report.get("key_insights", {})
     
-    lines = [
+    out.extend([
         "## 📋 Overview",
         "",
-    ]
+    ])
     
     if overview.get("purpose"):
-        lines.extend([
+        out.extend([
             "### Purpose",
             overview.get("purpose"),
             "",
         ])
     
     if insights.get("architecture_pattern"):
-        lines.extend([
+        out.extend([
             f"**Architecture Pattern:** {insights.get('architecture_pattern')}",
             "",
         ])
     
     if overview.get("architecture"):
-        lines.extend([
+        out.extend([
             "### Architecture",
             overview.get("architecture"),
             "",
         ])
-    
-    return "\n".join(lines)
 
 
-def _format_tech_stack(report: Dict[str, Any]) -> str:
+def _format_tech_stack(report: Dict[str, Any], out: List[str]):
     """Format tech stack section."""
     tech_stack = report.get("tech_stack", {})
     languages = tech_stack.get("languages", [])
     
-    lines = [
+    out.extend([
         "## 🛠️ Technology Stack",
         "",
-    ]
+    ])
     
     # Languages
     if languages:
-        lines.append("### Languages")
-        lines.append("")
-        lines.append("| Language | Files | Lines | Percentage |")
-        lines.append("|----------|-------|-------|------------|")
+        out.append("### Languages")
+        out.append("")
+        out.append("| Language | Files | Lines | Percentage |")
+        out.append("|----------|-------|-------|------------|")
         
         for lang in languages[:5]:  # Top 5 languages
-            lines.append(
+            out.append(
                 f"| {lang['language']} | {lang['files']} | "
                 f"{lang['lines']:,} | {lang['percentage']:.1f}% |"
             )
         
-        lines.append("")
+        out.append("")
     
     # Frameworks
     if tech_stack.get("frameworks"):
-        lines.append("### Frameworks")
+        out.append("### Frameworks")
         for fw in tech_stack["frameworks"]:
-            lines.append(f"- {fw}")
-        lines.append("")
+            out.append(f"- {fw}")
+        out.append("")
     
     # Databases
     if tech_stack.get("databases"):
-        lines.append("### Databases")
+        out.append("### Databases")
         for db in tech_stack["databases"]:
-            lines.append(f"- {db}")
-        lines.append("")
+            out.append(f"- {db}")
+        out.append("")
     
     # Infrastructure
     if tech_stack.get("infrastructure"):
-        lines.append("### Infrastructure & DevOps")
+        out.append("### Infrastructure & DevOps")
         for infra in tech_stack["infrastructure"]:
-            lines.append(f"- {infra}")
-        lines.append("")
-    
-    return "\n".join(lines)
+            out.append(f"- {infra}")
+        out.append("")
 
 
-def _format_architecture(report: Dict[str, Any]) -> str:
+def _format_architecture(report: Dict[str, Any], out: List[str]):
     """Format architecture insights section."""
     insights = report.get("key_insights", {})
     
-    lines = [
+    out.extend([
         "## 🏗️ Architecture Insights",
         "",
-    ]
+    ])
     
     if insights.get("key_modules"):
-        lines.extend([
+        out.extend([
             "### Key Modules",
             insights.get("key_modules"),
             "",
         ])
     
     if insights.get("tech_choices"):
-        lines.extend([
+        out.extend([
             "### Technology Choices",
             insights.get("tech_choices"),
             "",
         ])
-    
-    return "\n".join(lines)
 
 
-def _format_folder_structure(report: Dict[str, Any]) -> str:
+def _format_folder_structure(report: Dict[str, Any], out: List[str]):
     """Format folder structure section."""
     structure = report.get("structure", {})
     folders = structure.get("folders", [])
     
-    lines = [
+    out.extend([
         "## 📁 Repository Structure",
         "",
         f"**Total Folders:** {structure.get('total_folders', 0)}",
         "",
-    ]
+    ])
     
     if folders:
-        lines.append("| Folder | Role | Files |")
-        lines.append("|--------|------|-------|")
+        out.append("| Folder | Role | Files |")
+        out.append("|--------|------|-------|")
         
         for folder in folders:
-            role_emoji = {
-                "backend": "⚙️",
-                "frontend": "🎨",
-                "api": "🔌",
-                "database": "💾",
-                "config": "⚙️",
-                "tests": "🧪",
-                "docs": "📚",
-                "misc": "📦",
-            }.get(folder["role"], "📦")
+            role_emoji = ROLE_EMOJI.get(folder["role"], "📦")
             
-            lines.append(
+            out.append(
                 f"| `{folder['folder']}` | {role_emoji} {folder['role']} | "
                 f"{folder['file_count']} |"
             )
         
-        lines.append("")
-    
-    return "\n".join(lines)
+        out.append("")
 
 
-def _format_entry_points(report: Dict[str, Any]) -> str:
+def _format_entry_points(report: Dict[str, Any], out: List[str]):
     """Format entry points section."""
     entrypoints = report.get("entry_points", {})
     
-    lines = [
+    out.extend([
         "## 🚀 Entry Points",
         "",
         f"**Total Entry Points:** {entrypoints.get('total_entrypoints', 0)}",
         "",
-    ]
+    ])
     
     # Application files
     app_files = entrypoints.get("application_files", [])
     if app_files:
-        lines.append("### Application Files")
+        out.append("### Application Files")
         for entry in app_files[:10]:  # Limit to 10
-            lines.append(f"- `{entry['path']}` ({entry['type']})")
-        lines.append("")
+            out.append(f"- `{entry['path']}` ({entry['type']})")
+        out.append("")
     
     # Framework entrypoints
     framework_entries = entrypoints.get("framework_entrypoints", [])
     if framework_entries:
-        lines.append("### Framework Entry Points")
+        out.append("### Framework Entry Points")
         for entry in framework_entries[:10]:
-            lines.append(f"- `{entry['path']}` (Framework: {entry['framework']})")
-        lines.append("")
+            out.append(f"- `{entry['path']}` (Framework: {entry['framework']})")
+        out.append("")
     
     # Docker entrypoints
     docker_entries = entrypoints.get("docker_entrypoints", [])
     if docker_entries:
-        lines.append("### Docker Entry Points")
+        out.append("### Docker Entry Points")
         for entry in docker_entries[:5]:
-            lines.append(f"- `{entry['path']}`")
-            lines.append(f"  ```dockerfile")
-            lines.append(f"  {entry['command']}")
-            lines.append(f"  ```")
-        lines.append("")
-    
-    return "\n".join(lines)
+            out.append(f"- `{entry['path']}`")
+            out.append(f"  ```dockerfile")
+            out.append(f"  {entry['command']}")
+            out.append(f"  ```")
+        out.append("")
 
 
-def _format_execution_flow(report: Dict[str, Any]) -> str:
+def _format_execution_flow(report: Dict[str, Any], out: List[str]):
     """Format execution flow section."""
     exec_flow = report.get("execution_flow", {})
     
-    lines = [
+    out.extend([
         "## 🔄 Execution Flow",
         "",
-    ]
+    ])
     
     if exec_flow.get("entry_point"):
-        lines.extend([
+        out.extend([
             "### Entry Point",
             exec_flow.get("entry_point"),
             "",
         ])
     
     if exec_flow.get("request_flow"):
-        lines.extend([
+        out.extend([
             "### Request Flow",
             exec_flow.get("request_flow"),
             "",
         ])
     
     if exec_flow.get("key_interactions"):
-        lines.extend([
+        out.extend([
             "### Key Interactions",
             exec_flow.get("key_interactions"),
             "",
         ])
-    
-    return "\n".join(lines)
 
 
-def _format_module_summaries(report: Dict[str, Any]) -> str:
+def _format_module_summaries(report: Dict[str, Any], out: List[str]):
     """Format module summaries section."""
     structure = report.get("structure", {})
     folder_summaries = structure.get("folder_summaries", [])
     
-    if not folder_summaries:
-        return ""
-    
-    lines = [
+    out.extend([
         "## 📦 Module Summaries",
         "",
-    ]
+    ])
     
     for summary in folder_summaries[:10]:  # Limit to 10
         folder = summary.get("folder", "")
         role = summary.get("role", "")
         purpose = summary.get("purpose", "")
         
-        lines.extend([
+        out.extend([
             f"### `{folder}` ({role})",
             "",
         ])
         
         if purpose:
-            lines.extend([
+            out.extend([
                 "**Purpose:**",
                 purpose,
                 "",
             ])
         
         if summary.get("key_components"):
-            lines.extend([
+            out.extend([
                 "**Key Components:**",
                 summary.get("key_components"),
                 "",
             ])
         
         if summary.get("interactions"):
-            lines.extend([
+            out.extend([
                 "**Interactions:**",
                 summary.get("interactions"),
                 "",
             ])
-    
-    return "\n".join(lines)
 
 
-def _format_diagrams(report: Dict[str, Any]) -> str:
+def _format_diagrams(report: Dict[str, Any], out: List[str]):
     """Format diagrams section."""
     diagrams = report.get("diagrams", {})
     
-    lines = [
+    out.extend([
         "## 📊 Visual Diagrams",
         "",
-    ]
+    ])
     
     # Execution flow diagram
     if diagrams.get("flow_diagram"):
-        lines.extend([
+        out.extend([
             "### Execution Flow Diagram",
             "",
             "```mermaid",
@@ -377,7 +414,7 @@ def _format_diagrams(report: Dict[str, Any]) -> str:
     
     # Module diagram
     if diagrams.get("module_diagram"):
-        lines.extend([
+        out.extend([
             "### Module Structure Diagram",
             "",
             "```mermaid",
@@ -388,7 +425,7 @@ def _format_diagrams(report: Dict[str, Any]) -> str:
     
     # Dependency diagram (optional, can be large)
     if diagrams.get("dependency_diagram"):
-        lines.extend([
+        out.extend([
             "### Dependency Graph",
             "",
             "```mermaid",
@@ -396,20 +433,16 @@ def _format_diagrams(report: Dict[str, Any]) -> str:
             "```",
             "",
         ])
-    
-    return "\n".join(lines)
 
 
-def _format_dependencies(report: Dict[str, Any]) -> str:
+def _format_dependencies(report: Dict[str, Any], out: List[str]):
     """Format dependencies section (optional)."""
     dependencies = report.get("dependencies", {})
     
-    lines = [
+    out.extend([
         "## 🔗 Dependencies",
         "",
         f"**Total Nodes:** {dependencies.get('total_nodes', 0)}  ",
         f"**Total Edges:** {dependencies.get('total_edges', 0)}  ",
         "",
-    ]
-    
-    return "\n".join(lines)
\ No newline at end of file
+    ])
\ No newline at end of file
@@ -3,6 +3,30 @@ Report builder for RepoAnalyzer.
 Assembles all analysis results into a structured report.
 """
 from typing import Dict, List, Any
+import heapq
+
+# Display order of folder roles in the structure section
+ROLE_PRIORITY = {
+    "backend": 1,
+    "frontend": 2,
+    "api": 3,
+    "database": 4,
+    "config": 5,
+    "tests": 6,
+    "docs": 7,
+    "misc": 99,
+}
+
+# Folder roles and frameworks that identify each architecture pattern
+FRONTEND_ROLES = frozenset({"frontend", "client", "ui"})
+BACKEND_ROLES = frozenset({"backend", "api", "services"})
+DATABASE_ROLES = frozenset({"database", "models"})
+SPA_FRAMEWORKS = frozenset({"React", "Vue", "Angular"})
+WEB_FRAMEWORKS = frozenset({"Flask", "Django", "FastAPI", "Express"})
+ML_FRAMEWORKS = frozenset({"PyTorch", "TensorFlow", "Scikit-learn"})
+
+# Maximum number of folders listed in the structure section
+MAX_FOLDERS_RENDERED = 200
 
 
 def build_report(
@@ -47,6 +71,12 @@ def build_report(
     Returns:
         Structured report dictionary with all analysis results
     """
+    application_files = entrypoints.get("application_files", [])
+    framework_entrypoints = entrypoints.get("framework_entrypoints", [])
+    # Bind the summary lookups once; both dicts are read field by field below
+    arch_get = architecture_summary.get
+    flow_get = execution_flow_summary.get
+    
     report = {
         "metadata": {
             "repo_name": repo_metadata.get("repo", "Unknown"),
@@ -58,9 +88,9 @@ def build_report(
         },
         
         "overview": {
-            "purpose": architecture_summary.get("purpose", ""),
-            "architecture": architecture_summary.get("architecture", ""),
-            "summary": architecture_summary.get("summary", ""),
+            "purpose": arch_get("purpose", ""),
+            "architecture": arch_get("architecture", ""),
+            "summary": arch_get("summary", ""),
         },
         
         "tech_stack": {
@@ -79,18 +109,17 @@ def build_report(
         },
         
         "entry_points": {
-            "application_files": entrypoints.get("application_files", []),
-            "framework_entrypoints": entrypoints.get("framework_entrypoints", []),
+            "application_files": application_files,
+            "framework_entrypoints": framework_entrypoints,
             "docker_entrypoints": entrypoints.get("docker_entrypoints", []),
-            "total_entrypoints": len(entrypoints.get("application_files", [])) + 
-                                len(entrypoints.get("framework_entrypoints", [])),
+            "total_entrypoints": len(application_files) + len(framework_entrypoints),
         },
         
         "execution_flow": {
-            "description": execution_flow_summary.get("summary", ""),
-            "entry_point": execution_flow_summary.get("entry_point", ""),
-            "request_flow": execution_flow_summary.get("request_flow", ""),
-            "key_interactions": execution_flow_summary.get("key_interactions", ""),
+            "description": flow_get("summary", ""),
+            "entry_point": flow_get("entry_point", ""),
+            "request_flow": flow_get("request_flow", ""),
+            "key_interactions": flow_get("key_interactions", ""),
             "stages": execution_flow_dict.get("stages", []),
             "connections": execution_flow_dict.get("connections", []),
         },
@@ -98,15 +127,15 @@ def build_report(
         "dependencies": {
             "graph": dependency_graph_dict,
             "total_nodes": len(dependency_graph_dict.get("nodes", [])),
-            "total_edges": sum(len(deps) for deps in dependency_graph_dict.get("edges", {}).values()),
+            "total_edges": sum(map(len, dependency_graph_dict.get("edges", {}).values())),
         },
         
         "key_insights": {
             "architecture_pattern": _infer_architecture_pattern(
                 folder_structure, frameworks, folder_summaries
             ),
-            "tech_choices": architecture_summary.get("tech_choices", ""),
-            "key_modules": architecture_summary.get("key_modules", ""),
+            "tech_choices": arch_get("tech_choices", ""),
+            "key_modules": arch_get("key_modules", ""),
         },
         
         "file_summaries": _format_file_summaries(file_summaries),
@@ -125,61 +154,51 @@ def _format_language_stats(language_stats: Dict[str, Any]) -> List[Dict[str, Any
     """Format language statistics for report."""
     languages = language_stats.get("languages", {})
     
-    formatted = []
-    for lang, stats in languages.items():
-        formatted.append({
+    return [
+        {
             "language": lang,
             "files": stats.get("files", 0),
             "lines": stats.get("lines", 0),
             "percentage": stats.get("percentage", 0.0),
-        })
-    
-    return formatted
+        }
+        for lang, stats in languages.items()
+    ]
 
 
 def _format_folder_structure(folder_structure: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Format folder structure for report."""
-    formatted = []
-    
-    for folder, info in folder_structure.items():
-        formatted.append({
+    """Format folder structure for report, keeping the highest-priority folders."""
+    rows = (
+        {
             "folder": folder,
             "role": info.get("role", "misc"),
             "file_count": info.get("file_count", 0),
-        })
+        }
+        for folder, info in folder_structure.items()
+    )
     
-    # Sort by role priority
-    role_priority = {
-        "backend": 1,
-        "frontend": 2,
-        "api": 3,
-        "database": 4,
-        "config": 5,
-        "tests": 6,
-        "docs": 7,
-        "misc": 99,
-    }
-    
-    formatted.sort(key=lambda x: role_priority.get(x["role"], 50))
+    # Sort by role priority; large repos only keep the top folders, which
+    # nsmallest selects without sorting the whole list
+    role_priority = ROLE_PRIORITY.get
+    priority = lambda x: role_priority(x["role"], 50)
+    if len(folder_structure) > MAX_FOLDERS_RENDERED:
+        return heapq.nsmallest(MAX_FOLDERS_RENDERED, rows, key=priority)
     
-    return formatted
+    return sorted(rows, key=priority)
 
 
 def _format_folder_summaries(folder_summaries: List[Dict[str, str]]) -> List[Dict[str, Any]]:
     """Format folder summaries for report."""
-    formatted = []
-    
-    for summary in folder_summaries:
-        formatted.append({
+    return [
+        {
             "folder": summary.get("folder", ""),
             "role": summary.get("role", ""),
             "purpose": summary.get("purpose", ""),
             "key_components": summary.get("key_components", ""),
             "interactions": summary.get("interactions", ""),
             "summary": summary.get("summary", ""),
-        })
-    
-    return formatted
+        }
+        for summary in folder_summaries
+    ]
 
 
 def _format_file_summaries(file_summaries: List[Dict[str, str]]) -> List[Dict[str, Any]]:
@@ -187,23 +206,20 @@ def _format_file_summaries(file_summaries: List[Dict[str, str]]) -> List[Dict[st
     # Filter out skipped/error files
     valid_summaries = [
         s for s in file_summaries
-        if s.get("summary") and 
-        not s["summary"].startswith("Error") and 
-        not s["summary"].startswith("File skipped")
+        if (text := s.get("summary")) and not text.startswith(("Error", "File skipped"))
     ]
     
     # Limit to top 20 files
-    formatted = []
-    for summary in valid_summaries[:20]:
-        formatted.append({
+    return [
+        {
             "path": summary.get("path", ""),
             "language": summary.get("language", ""),
             "purpose": summary.get("purpose", ""),
             "responsibilities": summary.get("responsibilities", ""),
             "dependencies": summary.get("dependencies", ""),
-        })
-    
-    return formatted
+        }
+        for summary in valid_summaries[:20]
+    ]
 
 
 def _infer_architecture_pattern(
@@ -212,31 +228,32 @@ def _infer_architecture_pattern(
     folder_summaries: List[Dict[str, str]]
 ) -> str:
     """Infer the likely architecture pattern from structure and frameworks."""
-    roles = [info.get("role", "") for info in folder_structure.values()]
+    roles = {info.get("role", "") for info in folder_structure.values()}
     
     # Check for common patterns
-    has_frontend = any(role in ["frontend", "client", "ui"] for role in roles)
-    has_backend = any(role in ["backend", "api", "services"] for role in roles)
-    has_database = any(role in ["database", "models"] for role in roles)
+    has_frontend = not FRONTEND_ROLES.isdisjoint(roles)
+    has_backend = not BACKEND_ROLES.isdisjoint(roles)
+    has_database = not DATABASE_ROLES.isdisjoint(roles)
+    has_web_framework = not WEB_FRAMEWORKS.isdisjoint(frameworks)
     
     # Pattern detection
     if has_frontend and has_backend:
-        if any(fw in ["React", "Vue", "Angular"] for fw in frameworks):
+        if not SPA_FRAMEWORKS.isdisjoint(frameworks):
             return "Full-stack web application (Frontend + Backend)"
         return "Client-Server architecture"
     
     if has_backend and has_database:
-        if any(fw in ["Flask", "Django", "FastAPI", "Express"] for fw in frameworks):
+        if has_web_framework:
             return "Backend API service with database"
         return "Backend application"
     
-    if has_backend and any(fw in ["Flask", "Django", "FastAPI", "Express"] for fw in frameworks):
+    if has_backend and has_web_framework:
         return "Web API/Microservice"
     
     if has_frontend:
         return "Frontend application"
     
-    if any(fw in ["PyTorch", "TensorFlow", "Scikit-learn"] for fw in frameworks):
+    if not ML_FRAMEWORKS.isdisjoint(frameworks):
         return "Machine Learning / Data Science project"
     
     return "Modular application"
\ No newline at end of file
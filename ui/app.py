@@ -1,9 +1,13 @@
 import streamlit as st
+import asyncio
 import os
+import zipfile
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlparse
 from dotenv import load_dotenv
-import uuid
 
 import streamlit.components.v1 as components
 
@@ -14,9 +18,10 @@ sys.path.insert(0, str(project_root))
 # Import all necessary modules
 from github_client.repo_loader import RepoLoader
 from analysis.language_detector import get_repo_language_stats  # Changed from detect_languages
-from analysis.stack_detector import detect_frameworks, detect_databases, detect_infrastructure  # Import individual functions
+from analysis.stack_detector import detect_stack
 from analysis.structure_analyzer import classify_folders  # This is correct
 from analysis.entrypoint_finder import find_entrypoints  # Changed from detect_entrypoints
+from analysis.file_index import prepare_files
 
 # LLM layer - These are correct (classes)
 from llm.file_summarizer import FileSummarizer
@@ -36,66 +41,143 @@ from graph.diagram_generator import (
 from output.report_builder import build_report
 from output.formatter import format_markdown, format_json
 
-load_dotenv()
+# Deterministic analyzers over the repository files, cached by name
+FILE_ANALYZERS = {
+    "language_stats": get_repo_language_stats,
+    "stack": detect_stack,
+    "folder_structure": classify_folders,
+    "entrypoints": find_entrypoints,
+    "dependency_graph": build_dependency_graph,
+}
+
+
+@st.cache_resource(show_spinner=False)
+def load_environment() -> str:
+    """Load the .env file once per process and get the GitHub token."""
+    load_dotenv()
+    return os.getenv("GITHUB_TOKEN", "")
+
+
 # DEBUG
-github_token = os.getenv("GITHUB_TOKEN")
+github_token = load_environment()
 if github_token:
     st.sidebar.success(f"✅ GitHub token loaded (ends with: ...{github_token[-4:]})")
 else:
     st.sidebar.error("❌ GITHUB_TOKEN not found in .env file!")
 # DEBUG ENDS
-def save_outputs(repo_name: str, markdown_report: str, json_report: str, diagrams: dict):
+def save_outputs(
+    repo_name: str,
+    markdown_report: str,
+    json_report: str,
+    diagrams: dict,
+    save_loose_files: bool = False
+):
     """
-    Save all generated outputs to disk.
+    Save all generated outputs to disk as a single report.zip archive.
     
     Args:
         repo_name: Repository name for folder creation
         markdown_report: Markdown report content
         json_report: JSON report content
         diagrams: Dictionary with diagram content
+        save_loose_files: Also write each output as its own file next to the archive
     """
-    # Create output directory structure
+    # Create output directory
     output_dir = Path("outputs") / repo_name
-    diagrams_dir = output_dir / "diagrams"
-    
     output_dir.mkdir(parents=True, exist_ok=True)
-    diagrams_dir.mkdir(exist_ok=True)
-    
-    # Save markdown report
-    with open(output_dir / "report.md", "w", encoding="utf-8") as f:
-        f.write(markdown_report)
     
-    # Save JSON report
-    with open(output_dir / "report.json", "w", encoding="utf-8") as f:
-        f.write(json_report)
-    
-    # Save diagrams
-    if diagrams.get("dependency_diagram"):
-        with open(diagrams_dir / "dependency.mmd", "w", encoding="utf-8") as f:
-            f.write(diagrams["dependency_diagram"])
-    
-    if diagrams.get("flow_diagram"):
-        with open(diagrams_dir / "execution_flow.mmd", "w", encoding="utf-8") as f:
-            f.write(diagrams["flow_diagram"])
+    # Collect outputs by their path inside the archive
+    outputs = {
+        "report.md": markdown_report,
+        "report.json": json_report,
+    }
     
-    if diagrams.get("module_diagram"):
-        with open(diagrams_dir / "module_structure.mmd", "w", encoding="utf-8") as f:
-            f.write(diagrams["module_diagram"])
+    for key, file_name in (
+        ("dependency_diagram", "dependency.mmd"),
+        ("flow_diagram", "execution_flow.mmd"),
+        ("module_diagram", "module_structure.mmd"),
+    ):
+        if diagrams.get(key):
+            outputs[f"diagrams/{file_name}"] = diagrams[key]
     
-    # Save metadata
+    # Metadata
     metadata = {
         "repo_name": repo_name,
         "analysis_date": datetime.now().isoformat(),
         "output_location": str(output_dir.absolute()),
     }
+    outputs["metadata.json"] = format_json(metadata)
     
-    import json
-    with open(output_dir / "metadata.json", "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2)
+    # Write everything in one archive
+    with zipfile.ZipFile(output_dir / "report.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in outputs.items():
+            zf.writestr(name, content)
+    
+    if save_loose_files:
+        for name, content in outputs.items():
+            path = output_dir / name
+            path.parent.mkdir(exist_ok=True)
+            path.write_text(content, encoding="utf-8")
     
     return str(output_dir.absolute())
 
 
+@st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
+def load_repository_cached(owner: str, repo: str, branch: str) -> dict:
+    """
+    Load a repository, reusing the result for repeated analyses within an hour.
+    
+    Args:
+        owner: GitHub repository owner
+        repo: Repository name
+        branch: Branch name
+        
+    Returns:
+        Repository data from RepoLoader.load_repository()
+    """
+    return RepoLoader().load_repository(f"https://github.com/{owner}/{repo}", branch)
+
+
+def files_signature(files: list) -> int:
+    """Identify a set of repository files by their paths and contents."""
+    return hash(tuple((f["path"], f["content"]) for f in files))
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def analyze_files_cached(analyzer: str, signature: int, _files: list):
+    """
+    Run a file analyzer, reusing its result when the same files were analyzed before.
+    
+    Args:
+        analyzer: Name of the analyzer in FILE_ANALYZERS
+        signature: files_signature() of the files; the files themselves are not hashed
+        _files: Files passed to the analyzer
+        
+    Returns:
+        The analyzer's result
+    """
+    return FILE_ANALYZERS[analyzer](_files)
+
+
+@st.cache_resource(show_spinner=False)
+def get_summarizers(llm_provider: str) -> tuple:
+    """
+    Get the summarizers for an LLM provider, reusing their client across analyses.
+    
+    Args:
+        llm_provider: LLM provider to use
+        
+    Returns:
+        Tuple of (FileSummarizer, FolderSummarizer, RepoSummarizer)
+    """
+    return (
+        FileSummarizer(llm_provider),
+        FolderSummarizer(llm_provider),
+        RepoSummarizer(llm_provider),
+    )
+
+
+@lru_cache(maxsize=128)
 def parse_github_url(url: str) -> tuple:
     """
     Parse GitHub URL to extract owner and repo.
@@ -106,23 +188,36 @@ def parse_github_url(url: str) -> tuple:
     Returns:
         Tuple of (owner, repo) or (None, None) if invalid
     """
-    url = url.strip().rstrip("/")
+    url = url.strip()
     
-    # Handle different URL formats
-    if "github.com" in url:
-        parts = url.split("github.com/")[-1].split("/")
+    # Handle different URL formats; bare "github.com/owner/repo" has no scheme
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    if parsed.hostname in ("github.com", "www.github.com"):
+        parts = [part for part in parsed.path.split("/") if part]
         if len(parts) >= 2:
-            return parts[0], parts[1]
+            return parts[0], parts[1].removesuffix(".git")
     
     return None, None
 
-def render_mermaid(mermaid_code: str, height: int = 500):
-    diagram_id = f"mermaid-{uuid.uuid4()}"
-
-    html = f"""
-    <div id="{diagram_id}" class="mermaid">
+def render_mermaid(diagrams: list):
+    """
+    Render Mermaid diagrams in a single frame so Mermaid is loaded only once.
+    
+    Args:
+        diagrams: List of (title, mermaid_code, height) tuples
+    """
+    sections = "".join(
+        f"""
+    <h4 style="font-family: sans-serif;">{title}</h4>
+    <div class="mermaid" style="min-height: {height}px;">
     {mermaid_code}
     </div>
+    """
+        for title, mermaid_code, height in diagrams
+    )
+
+    html = f"""
+    {sections}
 
     <script src="https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"></script>
     <script>
@@ -131,14 +226,12 @@ def render_mermaid(mermaid_code: str, height: int = 500):
             theme: "default"
         }});
 
-        const el = document.getElementById("{diagram_id}");
-        if (el) {{
-            mermaid.run({{ nodes: [el] }});
-        }}
+        mermaid.run({{ nodes: document.querySelectorAll(".mermaid") }});
     </script>
     """
 
-    components.html(html, height=height)
+    # Leave room for each diagram's heading
+    components.html(html, height=sum(height + 60 for _, _, height in diagrams), scrolling=True)
 
 
 def run_analysis(owner: str, repo: str, branch: str, llm_provider: str):
@@ -154,120 +247,121 @@ def run_analysis(owner: str, repo: str, branch: str, llm_provider: str):
     Returns:
         Tuple of (report_dict, markdown_report, json_report, output_path)
     """
-    # Set LLM provider in environment
-    os.environ["LLM_PROVIDER"] = llm_provider
-    
     # Stage 1: Load repository
-    st.write("📥 **Stage 1: Loading repository...**")
+    # Stages report into one status container; the progress bar moves once per stage
+    status = st.status("📥 Stage 1: Loading repository...", expanded=True)
     progress_bar = st.progress(0)
     
-    repo_url = f"https://github.com/{owner}/{repo}"
-    repo_loader = RepoLoader()
-    repo_data = repo_loader.load_repository(repo_url, branch)
+    repo_data = load_repository_cached(owner, repo, branch)
     # Debug
     # st.write("**DEBUG: repo_data keys:**", list(repo_data.keys()))
     # st.write("**DEBUG: repo_data structure:**", repo_data)
     # Debug ends
     files = repo_data["files"]
     metadata = repo_data["metadata"]
-    progress_bar.progress(15)
-    st.success(f"✅ Loaded {len(files)} files from {owner}/{repo}")
+    status.write(f"✅ Loaded {len(files)} files from {owner}/{repo}")
+    progress_bar.progress(25)
     
     # Stage 2: Static Analysis
-    st.write("🔍 **Stage 2: Running static analysis...**")
+    status.update(label="🔍 Stage 2: Running static analysis...")
+    
+    # Derive per-file fields once for all analyzers; results are cached per file set
+    prepared_files = prepare_files(files)
+    signature = files_signature(files)
     
     # Language detection
-    st.write("   - Detecting languages...")
-    language_stats = get_repo_language_stats(files)
-    progress_bar.progress(25)
+    language_stats = analyze_files_cached("language_stats", signature, prepared_files)
     
-    # Stack detection
-    st.write("   - Detecting tech stack...")
-    frameworks = detect_frameworks(files)
-    databases = detect_databases(files)
-    infrastructure = detect_infrastructure(files)
-    progress_bar.progress(35)
+    # Stack detection, sharing each file's keyword scan between detectors
+    stack = analyze_files_cached("stack", signature, prepared_files)
+    frameworks = stack["frameworks"]
+    databases = stack["databases"]
+    infrastructure = stack["infrastructure"]
     
     # Structure analysis
-    st.write("   - Analyzing folder structure...")
-    folder_structure = classify_folders(files)
-    progress_bar.progress(45)
+    folder_structure = analyze_files_cached("folder_structure", signature, prepared_files)
     
     # Entry point detection
-    st.write("   - Detecting entry points...")
-    entrypoints = find_entrypoints(files)
-    progress_bar.progress(50)
+    entrypoints = analyze_files_cached("entrypoints", signature, prepared_files)
     
-    st.success("✅ Static analysis complete")
+    status.write("✅ Static analysis complete")
+    progress_bar.progress(50)
     
     # Stage 3: LLM Summaries
-    st.write("🤖 **Stage 3: Generating LLM summaries...**")
+    status.update(label="🤖 Stage 3: Generating LLM summaries...")
     
     # File summaries (limit to important files)
-    st.write("   - Summarizing key files...")
-    file_summarizer = FileSummarizer()
-    file_summaries = []
+    file_summarizer, folder_summarizer, repo_summarizer = get_summarizers(llm_provider)
     
-    # Prioritize entry points and important files
+    # Prioritize entry points and important files, looked up by path
     important_files = [e["path"] for e in entrypoints.get("application_files", [])][:10]
-    for file_obj in files:
-        if file_obj["path"] in important_files:
-            summary = file_summarizer.summarize_file(file_obj["path"], file_obj["content"])
-            file_summaries.append(summary)
-    progress_bar.progress(60)
-    
-    # Folder summaries
-    st.write("   - Summarizing modules...")
-    folder_summarizer = FolderSummarizer()
-    folder_summaries = []
-    
-    for folder_path, folder_info in folder_structure.items():
-        # Get files in this folder
-        folder_files = [s for s in file_summaries if s["path"].startswith(folder_path)]
-        if folder_files:
-            summary = folder_summarizer.summarize_folder(
-                folder_path,
-                folder_info["role"],
-                folder_files
-            )
-            folder_summaries.append(summary)
-    progress_bar.progress(70)
+    files_by_path = {file_obj["path"]: file_obj for file_obj in files}
     
-    # Repository summary
-    st.write("   - Generating repository overview...")
-    repo_summarizer = RepoSummarizer()
+    # Show architecture sections while the rest of the summary is still streaming
+    section_preview = status.empty()
+    streamed_sections = {}
     
-    architecture_summary = repo_summarizer.summarize_architecture(
-        repo_name=repo,
-        description=metadata.get("description", ""),
-        languages=language_stats["languages"],
-        frameworks=frameworks,
-        databases=databases,
-        infrastructure=infrastructure,
-        folder_summaries=folder_summaries,
-        entrypoints=entrypoints
-    )
+    def show_section(name: str, text: str):
+        streamed_sections[name] = text
+        section_preview.markdown("\n\n".join(
+            f"**{section}:** {section_text}" for section, section_text in streamed_sections.items()
+        ))
     
-    execution_flow_summary = repo_summarizer.summarize_execution_flow(
-        repo_name=repo,
-        entrypoints=entrypoints,
-        frameworks=frameworks,
-        folder_summaries=folder_summaries
-    )
-    progress_bar.progress(80)
+    async def summarize():
+        # All LLM calls share one event loop, so the async client is built and closed once
+        try:
+            file_summaries = await file_summarizer.summarize_files([
+                (path, files_by_path[path]["content"])
+                for path in dict.fromkeys(important_files)
+                if path in files_by_path
+            ])
+            
+            # Folder summaries
+            folders_to_summarize = []
+            
+            # Group file summaries by top-level folder once instead of scanning them per folder
+            files_by_folder = defaultdict(list)
+            for summary in file_summaries:
+                folder, slash, _ = summary["path"].partition("/")
+                if slash:
+                    files_by_folder[folder].append(summary)
+            
+            for folder_path, folder_info in folder_structure.items():
+                # Get files in this folder
+                folder_files = files_by_folder.get(folder_path)
+                if folder_files:
+                    folders_to_summarize.append((folder_path, folder_info["role"], folder_files))
+            
+            folder_summaries = await folder_summarizer.summarize_folders(folders_to_summarize)
+            
+            # Repository summary
+            repo_summaries = await repo_summarizer.summarize_all(
+                repo_name=repo,
+                description=metadata.get("description", ""),
+                languages=language_stats["languages"],
+                frameworks=frameworks,
+                databases=databases,
+                infrastructure=infrastructure,
+                folder_summaries=folder_summaries,
+                entrypoints=entrypoints,
+                on_section=show_section
+            )
+            return file_summaries, folder_summaries, repo_summaries
+        finally:
+            await repo_summarizer.client.aclose()
     
-    st.success("✅ LLM summaries generated")
+    file_summaries, folder_summaries, (architecture_summary, execution_flow_summary) = asyncio.run(summarize())
+    
+    status.write("✅ LLM summaries generated")
+    progress_bar.progress(75)
     
     # Stage 4: Graph & Flow Building
-    st.write("📊 **Stage 4: Building graphs and flows...**")
+    status.update(label="📊 Stage 4: Building graphs and flows...")
     
     # Dependency graph
-    st.write("   - Building dependency graph...")
-    dependency_graph = build_dependency_graph(files)
-    progress_bar.progress(85)
+    dependency_graph = analyze_files_cached("dependency_graph", signature, prepared_files)
     
     # Execution flow
-    st.write("   - Building execution flow...")
     execution_flow = build_execution_flow(
         entrypoints=entrypoints,
         folder_summaries=folder_summaries,
@@ -275,19 +369,18 @@ def run_analysis(owner: str, repo: str, branch: str, llm_provider: str):
         databases=databases,
         infrastructure=infrastructure
     )
-    progress_bar.progress(90)
     
     # Generate diagrams
-    st.write("   - Generating Mermaid diagrams...")
-    dependency_diagram = generate_dependency_diagram(dependency_graph, max_nodes=15)
-    flow_diagram = generate_flow_diagram(execution_flow)
-    module_diagram = generate_module_diagram(folder_summaries, max_modules=10)
-    progress_bar.progress(95)
+    diagrams = {
+        "dependency_diagram": generate_dependency_diagram(dependency_graph, max_nodes=15),
+        "flow_diagram": generate_flow_diagram(execution_flow),
+        "module_diagram": generate_module_diagram(folder_summaries, max_modules=10),
+    }
     
-    st.success("✅ Graphs and flows built")
+    status.write("✅ Graphs and flows built")
     
     # Stage 5: Build Final Report
-    st.write("📝 **Stage 5: Building final report...**")
+    status.update(label="📝 Stage 5: Building final report...")
     
     report = build_report(
         repo_metadata=metadata,
@@ -303,25 +396,25 @@ def run_analysis(owner: str, repo: str, branch: str, llm_provider: str):
         execution_flow_summary=execution_flow_summary,
         dependency_graph_dict=dependency_graph.to_dict(),
         execution_flow_dict=execution_flow.to_dict(),
-        dependency_diagram=dependency_diagram,
-        flow_diagram=flow_diagram,
-        module_diagram=module_diagram
+        dependency_diagram=diagrams["dependency_diagram"],
+        flow_diagram=diagrams["flow_diagram"],
+        module_diagram=diagrams["module_diagram"]
     )
     
     # Format reports
     markdown_report = format_markdown(report)
     json_report = format_json(report)
-    progress_bar.progress(98)
     
     # Save outputs
-    st.write("💾 **Saving outputs to disk...**")
+    status.update(label="💾 Saving outputs to disk...")
     output_path = save_outputs(
         repo_name=repo,
         markdown_report=markdown_report,
         json_report=json_report,
-        diagrams=report["diagrams"]
+        diagrams=diagrams
     )
     progress_bar.progress(100)
+    status.update(label="✅ Analysis complete", state="complete", expanded=False)
     
     st.success(f"✅ Analysis complete! Outputs saved to: `{output_path}`")
     
@@ -436,21 +529,21 @@ def main():
 
                 diagrams = report.get("diagrams", {})
 
-                if diagrams.get("flow_diagram"):
-                    st.markdown("#### Execution Flow Diagram")
-                    render_mermaid(diagrams["flow_diagram"], height=450)
-
-                if diagrams.get("module_diagram"):
-                    st.markdown("#### Module Structure Diagram")
-                    render_mermaid(diagrams["module_diagram"], height=450)
-
-                if diagrams.get("dependency_diagram"):
-                    st.markdown("#### Dependency Graph")
-                    render_mermaid(diagrams["dependency_diagram"], height=600)
+                diagrams_to_render = [
+                    (title, diagrams[key], height)
+                    for key, title, height in (
+                        ("flow_diagram", "Execution Flow Diagram", 450),
+                        ("module_diagram", "Module Structure Diagram", 450),
+                        ("dependency_diagram", "Dependency Graph", 600),
+                    )
+                    if diagrams.get(key)
+                ]
+                if diagrams_to_render:
+                    render_mermaid(diagrams_to_render)
 
             with tab3:
                 st.markdown("### JSON Report")
-                st.json(report)
+                st.json(json_report)
             
             with tab4:
                 st.markdown("### Download Reports")
@@ -474,6 +567,12 @@ def main():
                     )
                 
                 with col3:
+                    st.download_button(
+                        label="🗜️ Download ZIP",
+                        data=(Path(output_path) / "report.zip").read_bytes(),
+                        file_name=f"{repo}_analysis.zip",
+                        mime="application/zip"
+                    )
                     st.markdown(f"**Files saved to:**\\n`{output_path}`")
         
         except Exception as e: